@@ -4,6 +4,7 @@
 Simplified setup script for immediate hackathon use
 """
 
+import importlib.util
 import os
 import sys
 import subprocess
@@ -35,18 +36,17 @@ def install_requirements():
     print("\n📦 Installing Python dependencies...")
     
     try:
-        # Install requirements
-        result = subprocess.run([
-            sys.executable, "-m", "pip", "install", "-r", "requirements.txt"
-        ], capture_output=True, text=True, check=True)
+        # Install requirements, streaming pip's output instead of buffering it
+        subprocess.run([
+            sys.executable, "-m", "pip", "install", "-r", "requirements.txt",
+            "--progress-bar", "off"
+        ], check=True)
         
         print("✅ Dependencies installed successfully")
         return True
         
     except subprocess.CalledProcessError as e:
         print(f"❌ Error installing dependencies: {e}")
-        print(f"Output: {e.stdout}")
-        print(f"Error: {e.stderr}")
         return False
 
 def check_env_file():
@@ -78,7 +78,9 @@ LOG_LEVEL=INFO
 """
     
     try:
-        with open(".env", "w") as f:
+        # Owner-only from creation: .env will hold the Blockfrost API key
+        fd = os.open(".env", os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
             f.write(env_content)
         print("✅ .env file created")
         print("⚠️  Remember to update BLOCKFROST_PROJECT_ID with your API key")
@@ -99,20 +101,30 @@ def test_imports():
         "uvicorn"
     ]
     
-    failed = []
-    for module in critical_modules:
-        try:
-            __import__(module)
-            print(f"✅ {module}")
-        except ImportError:
-            print(f"❌ {module}")
-            failed.append(module)
-    
-    if failed:
-        print(f"\n❌ Missing modules: {failed}")
-        print("💡 Try: pip install " + " ".join(failed))
+    # Import everything once in a fresh interpreter: it sees the packages pip just
+    # installed and fails on broken installs that find_spec alone would miss
+    result = subprocess.run(
+        [sys.executable, "-c", "import " + ", ".join(critical_modules)],
+        capture_output=True, text=True
+    )
+    
+    if result.returncode != 0:
+        # find_spec locates modules without executing them, naming the missing ones;
+        # drop the finder caches first so packages pip just added are visible
+        importlib.invalidate_caches()
+        missing = [module for module in critical_modules if importlib.util.find_spec(module) is None]
+        if missing:
+            print(f"\n❌ Missing modules: {missing}")
+            print("💡 Try: pip install " + " ".join(missing))
+        else:
+            error = result.stderr.strip().splitlines()
+            print(f"\n❌ Import failed: {error[-1] if error else 'unknown error'}")
+            print("💡 Try: pip install --force-reinstall -r requirements.txt")
         return False
     
+    for module in critical_modules:
+        print(f"✅ {module}")
+    
     print("✅ All critical imports successful")
     return True
 
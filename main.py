@@ -4,14 +4,17 @@ Cardano-Arduino-AI System Launcher
 Main entry point for the complete hackathon system
 """
 
-import asyncio
+import importlib.util
 import logging
 import os
 import signal
+import socket
 import subprocess
 import sys
+import threading
 import time
-from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, NamedTuple, Tuple
 from pathlib import Path
 
 # Add src to path
@@ -29,37 +32,50 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Environment settings the launcher uses, read once after .env is loaded
+ENV_DEFAULTS = {
+    "PAYMENT_SERVICE_PORT": "8000",
+    "AGENT_A_PORT": "8001",
+    "AGENT_B_PORT": "8002",
+    "ROUTER_PORT": "8003",
+    "ARDUINO_A_PORT": "COM3",
+    "ARDUINO_B_PORT": "COM4",
+    "ARDUINO_BAUD_RATE": "9600",
+}
+ENV = {key: os.getenv(key, default) for key, default in ENV_DEFAULTS.items()}
+
+HEALTH_CHECK_ATTEMPTS = 6  # 0.25 + 0.5 + 1 + 2 + 4 s of backoff between tries
+HEALTH_CHECK_BACKOFF = 0.25
+SERVICE_START_TIMEOUT = 15  # seconds a service gets to start listening
+SHUTDOWN_TIMEOUT = 10  # seconds services get to exit after SIGTERM
+
+class ServiceSpec(NamedTuple):
+    """How to launch and probe one service"""
+    name: str
+    cmd: Tuple[str, ...]
+    port: int
+    health_path: str
+    required: bool
+
 class SystemLauncher:
     """Main system launcher and coordinator"""
     
     def __init__(self):
-        self.processes: List[subprocess.Popen] = []
-        self.services = {
-            "payment_service": {
-                "cmd": [sys.executable, "src/blockchain/payment_service.py"],
-                "port": int(os.getenv("PAYMENT_SERVICE_PORT", "8000")),
-                "health_path": "/",
-                "required": True
-            },
-            "router": {
-                "cmd": [sys.executable, "src/agents/router.py"],
-                "port": int(os.getenv("ROUTER_PORT", "8003")),
-                "health_path": "/",
-                "required": True
-            },
-            "agent_a": {
-                "cmd": [sys.executable, "src/agents/agent_a.py"],
-                "port": int(os.getenv("AGENT_A_PORT", "8001")),
-                "health_path": "/",
-                "required": True
-            },
-            "agent_b": {
-                "cmd": [sys.executable, "src/agents/agent_b.py"],
-                "port": int(os.getenv("AGENT_B_PORT", "8002")),
-                "health_path": "/",
-                "required": True
-            }
-        }
+        self.processes: Dict[str, subprocess.Popen] = {}
+        self.failed_services: List[str] = []
+        self.service_exited = threading.Event()
+        self.stopping = threading.Event()
+        # In start order: the payment service and router come up before the agents
+        self.services: Tuple[ServiceSpec, ...] = (
+            ServiceSpec("payment_service", (sys.executable, "src/blockchain/payment_service.py"),
+                        int(ENV["PAYMENT_SERVICE_PORT"]), "/health", True),
+            ServiceSpec("router", (sys.executable, "src/agents/router.py"),
+                        int(ENV["ROUTER_PORT"]), "/", True),
+            ServiceSpec("agent_a", (sys.executable, "src/agents/agent_a.py"),
+                        int(ENV["AGENT_A_PORT"]), "/", True),
+            ServiceSpec("agent_b", (sys.executable, "src/agents/agent_b.py"),
+                        int(ENV["AGENT_B_PORT"]), "/", True),
+        )
         
         # Setup signal handlers
         signal.signal(signal.SIGINT, self.signal_handler)
@@ -75,17 +91,22 @@ class SystemLauncher:
         """Check if all required dependencies are installed"""
         logger.info("Checking dependencies...")
         
-        required_modules = [
-            "fastapi", "uvicorn", "flask", "requests", 
-            "pydantic", "python-dotenv", "pyserial"
-        ]
+        # pip package name -> import name
+        required_modules = {
+            "fastapi": "fastapi",
+            "uvicorn": "uvicorn",
+            "flask": "flask",
+            "requests": "requests",
+            "pydantic": "pydantic",
+            "python-dotenv": "dotenv",
+            "pyserial": "serial"
+        }
         
-        missing_modules = []
-        for module in required_modules:
-            try:
-                __import__(module.replace("-", "_"))
-            except ImportError:
-                missing_modules.append(module)
+        # find_spec only locates each module; importing them would run their top-level code
+        missing_modules = [
+            package for package, module in required_modules.items()
+            if importlib.util.find_spec(module) is None
+        ]
         
         if missing_modules:
             logger.error(f"Missing required modules: {missing_modules}")
@@ -97,104 +118,149 @@ class SystemLauncher:
     
     def check_ports(self) -> bool:
         """Check if required ports are available"""
-        import socket
-        
         logger.info("Checking port availability...")
         
-        for service_name, config in self.services.items():
-            port = config["port"]
-            
+        for spec in self.services:
+            # Bind the way the services will. On POSIX, SO_REUSEADDR ignores TIME_WAIT
+            # leftovers; on Windows it would let the bind share a port that is in use,
+            # so claim it exclusively there instead
             with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-                result = sock.connect_ex(("localhost", port))
-                if result == 0:
-                    logger.error(f"Port {port} already in use (required for {service_name})")
+                if os.name == "nt":
+                    sock.setsockopt(socket.SOL_SOCKET, socket.SO_EXCLUSIVEADDRUSE, 1)
+                else:
+                    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+                try:
+                    sock.bind(("0.0.0.0", spec.port))
+                except OSError:
+                    logger.error(f"Port {spec.port} already in use (required for {spec.name})")
                     return False
         
         logger.info("✅ All required ports available")
         return True
     
-    def start_service(self, service_name: str, config: Dict[str, Any]) -> subprocess.Popen:
+    def start_service(self, spec: ServiceSpec) -> subprocess.Popen:
         """Start a single service"""
-        logger.info(f"Starting {service_name} on port {config['port']}...")
+        logger.info(f"Starting {spec.name} on port {spec.port}...")
         
         try:
+            # close_fds=False lets Popen use posix_spawn instead of fork+exec;
+            # the launcher's own descriptors are non-inheritable anyway
             process = subprocess.Popen(
-                config["cmd"],
+                spec.cmd,
                 stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                universal_newlines=True,
-                bufsize=1
+                stderr=subprocess.STDOUT,
+                close_fds=False
             )
             
-            # Give the service a moment to start
-            time.sleep(2)
+            # Drain the pipe continuously so a chatty service never blocks on a full buffer
+            threading.Thread(target=self.forward_output, args=(spec.name, process.stdout), daemon=True).start()
             
-            if process.poll() is None:
-                logger.info(f"✅ {service_name} started successfully (PID: {process.pid})")
+            if self.wait_until_listening(spec.port, process):
+                logger.info(f"✅ {spec.name} started successfully (PID: {process.pid})")
                 return process
+            
+            if process.poll() is None:
+                logger.error(f"❌ {spec.name} did not open port {spec.port} within {SERVICE_START_TIMEOUT}s")
+                process.kill()
+                process.wait()
             else:
-                stdout, stderr = process.communicate()
-                logger.error(f"❌ {service_name} failed to start")
-                logger.error(f"STDOUT: {stdout}")
-                logger.error(f"STDERR: {stderr}")
-                return None
+                logger.error(f"❌ {spec.name} failed to start (exit code {process.returncode})")
+            return None
                 
         except Exception as e:
-            logger.error(f"❌ Error starting {service_name}: {e}")
+            logger.error(f"❌ Error starting {spec.name}: {e}")
             return None
     
-    def check_service_health(self, service_name: str, config: Dict[str, Any]) -> bool:
-        """Check if a service is healthy"""
+    def wait_until_listening(self, port: int, process: subprocess.Popen) -> bool:
+        """Poll until the service accepts connections on its port, or exits"""
+        deadline = time.monotonic() + SERVICE_START_TIMEOUT
+        
+        while time.monotonic() < deadline and process.poll() is None:
+            try:
+                with socket.create_connection(("127.0.0.1", port), timeout=1):
+                    return True
+            except OSError:
+                time.sleep(0.05)
+        
+        return False
+    
+    def register_service(self, spec: ServiceSpec, process: subprocess.Popen) -> bool:
+        """Track a started service; False if a required one failed to start"""
+        if process:
+            self.processes[spec.name] = process
+            threading.Thread(target=self.watch_service, args=(spec.name, process), daemon=True).start()
+            return True
+        
+        if spec.required:
+            logger.error(f"❌ Failed to start required service: {spec.name}")
+            return False
+        
+        logger.warning(f"⚠️ Optional service {spec.name} failed to start")
+        return True
+    
+    def forward_output(self, service_name: str, stream):
+        """Copy a service's output to the console, prefixed with its name"""
+        # The pipe is read in binary blocks; only complete lines get decoded
+        with stream:
+            for line in stream:
+                sys.stdout.write(f"[{service_name}] {line.decode(errors='replace')}")
+    
+    def watch_service(self, service_name: str, process: subprocess.Popen):
+        """Block until a service exits and report it to the monitor"""
+        process.wait()
+        if not self.stopping.is_set():
+            self.failed_services.append(service_name)
+            self.service_exited.set()
+    
+    def check_service_health(self, spec: ServiceSpec, session=None) -> bool:
+        """Check if a service is healthy, retrying with backoff while it warms up"""
         import requests
         
-        try:
-            url = f"http://localhost:{config['port']}{config['health_path']}"
-            response = requests.get(url, timeout=5)
+        http = session or requests
+        url = f"http://localhost:{spec.port}{spec.health_path}"
+        
+        for attempt in range(HEALTH_CHECK_ATTEMPTS):
+            if attempt:
+                time.sleep(HEALTH_CHECK_BACKOFF * 2 ** (attempt - 1))
             
-            if response.status_code == 200:
-                logger.info(f"✅ {service_name} health check passed")
-                return True
-            else:
-                logger.warning(f"⚠️ {service_name} health check failed: {response.status_code}")
-                return False
-                
-        except Exception as e:
-            logger.warning(f"⚠️ {service_name} health check failed: {e}")
-            return False
+            try:
+                response = http.get(url, timeout=2)
+                if response.status_code == 200:
+                    logger.info(f"✅ {spec.name} health check passed")
+                    return True
+                error = response.status_code
+            except Exception as e:
+                error = e
+        
+        logger.warning(f"⚠️ {spec.name} health check failed: {error}")
+        return False
     
     def start_all_services(self) -> bool:
         """Start all services in the correct order"""
         logger.info("🚀 Starting Cardano-Arduino-AI System...")
         
-        # Start services in dependency order
-        service_order = ["payment_service", "router", "agent_a", "agent_b"]
+        # Payment service and router come up first, in dependency order
+        core, agents = self.services[:2], self.services[2:]
+        for spec in core:
+            if not self.register_service(spec, self.start_service(spec)):
+                return False
         
-        for service_name in service_order:
-            config = self.services[service_name]
-            process = self.start_service(service_name, config)
-            
-            if process:
-                self.processes.append(process)
-                
-                # Wait a bit more for critical services
-                if service_name in ["payment_service", "router"]:
-                    time.sleep(3)
-            else:
-                if config["required"]:
-                    logger.error(f"❌ Failed to start required service: {service_name}")
-                    return False
-                else:
-                    logger.warning(f"⚠️ Optional service {service_name} failed to start")
+        # The agents only depend on the services above, so start them together
+        with ThreadPoolExecutor(max_workers=len(agents)) as pool:
+            processes = list(pool.map(self.start_service, agents))
+        
+        for spec, process in zip(agents, processes):
+            if not self.register_service(spec, process):
+                return False
         
-        # Health check all services
+        # Health check all services at once; each retries until its service is up
         logger.info("Performing health checks...")
-        time.sleep(5)  # Give services time to fully initialize
+        import requests
         
-        all_healthy = True
-        for service_name, config in self.services.items():
-            if not self.check_service_health(service_name, config):
-                if config["required"]:
-                    all_healthy = False
+        with requests.Session() as session, ThreadPoolExecutor(max_workers=len(self.services)) as pool:
+            results = list(pool.map(lambda spec: self.check_service_health(spec, session), self.services))
+        
+        all_healthy = all(healthy or not spec.required for healthy, spec in zip(results, self.services))
         
         if all_healthy:
             logger.info("🎉 All services started successfully!")
@@ -206,27 +272,31 @@ class SystemLauncher:
     
     def display_system_info(self):
         """Display system information and access URLs"""
-        print("\n" + "="*60)
-        print("🎉 CARDANO-ARDUINO-AI SYSTEM READY!")
-        print("="*60)
-        print(f"🔗 Router (Traffic Controller): http://localhost:{os.getenv('ROUTER_PORT', '8003')}")
-        print(f"🤖 Agent A (Buyer AI): http://localhost:{os.getenv('AGENT_A_PORT', '8001')}")
-        print(f"🛒 Agent B (Seller): http://localhost:{os.getenv('AGENT_B_PORT', '8002')}")
-        print(f"💰 Payment Service: http://localhost:{os.getenv('PAYMENT_SERVICE_PORT', '8000')}")
-        print(f"📊 System Status: http://localhost:{os.getenv('ROUTER_PORT', '8003')}/status")
-        print("\n📱 Test Commands:")
-        print("• Test Payment: curl http://localhost:8000/test_payment")
-        print("• Arduino Trigger: curl -X POST http://localhost:8003/arduino_trigger -H 'Content-Type: application/json' -d '{\"amount\": 150, \"product\": \"Sensor Data\"}'")
-        print("• System Status: curl http://localhost:8003/status")
-        print("\n🔌 Arduino Connections:")
-        print(f"• Arduino A: {os.getenv('ARDUINO_A_PORT', 'COM3')} @ {os.getenv('ARDUINO_BAUD_RATE', '9600')} baud")
-        print(f"• Arduino B: {os.getenv('ARDUINO_B_PORT', 'COM4')} @ {os.getenv('ARDUINO_BAUD_RATE', '9600')} baud")
-        print("\n💡 Tips:")
-        print("• Upload arduino_a.ino to your first Arduino")
-        print("• Upload arduino_b.ino to your second Arduino")
-        print("• Configure .env file with your Blockfrost API key for real blockchain")
-        print("• Press Ctrl+C to stop all services")
-        print("="*60)
+        # One write, so service output forwarded meanwhile cannot split the banner
+        banner = "\n".join([
+            "\n" + "="*60,
+            "🎉 CARDANO-ARDUINO-AI SYSTEM READY!",
+            "="*60,
+            f"🔗 Router (Traffic Controller): http://localhost:{ENV['ROUTER_PORT']}",
+            f"🤖 Agent A (Buyer AI): http://localhost:{ENV['AGENT_A_PORT']}",
+            f"🛒 Agent B (Seller): http://localhost:{ENV['AGENT_B_PORT']}",
+            f"💰 Payment Service: http://localhost:{ENV['PAYMENT_SERVICE_PORT']}",
+            f"📊 System Status: http://localhost:{ENV['ROUTER_PORT']}/status",
+            "\n📱 Test Commands:",
+            f"• Test Payment: curl http://localhost:{ENV['PAYMENT_SERVICE_PORT']}/test_payment",
+            f"• Arduino Trigger: curl -X POST http://localhost:{ENV['ROUTER_PORT']}/arduino_trigger -H 'Content-Type: application/json' -d '{{\"amount\": 150, \"product\": \"Sensor Data\"}}'",
+            f"• System Status: curl http://localhost:{ENV['ROUTER_PORT']}/status",
+            "\n🔌 Arduino Connections:",
+            f"• Arduino A: {ENV['ARDUINO_A_PORT']} @ {ENV['ARDUINO_BAUD_RATE']} baud",
+            f"• Arduino B: {ENV['ARDUINO_B_PORT']} @ {ENV['ARDUINO_BAUD_RATE']} baud",
+            "\n💡 Tips:",
+            "• Upload arduino_a.ino to your first Arduino",
+            "• Upload arduino_b.ino to your second Arduino",
+            "• Configure .env file with your Blockfrost API key for real blockchain",
+            "• Press Ctrl+C to stop all services",
+            "="*60
+        ])
+        sys.stdout.write(banner + "\n")
     
     def monitor_services(self):
         """Monitor running services"""
@@ -234,14 +304,13 @@ class SystemLauncher:
         
         try:
             while True:
-                time.sleep(30)  # Check every 30 seconds
+                # Sleep until a watcher thread reports an exit
+                self.service_exited.wait()
+                self.service_exited.clear()
                 
-                failed_services = []
-                for i, process in enumerate(self.processes):
-                    if process.poll() is not None:
-                        service_name = list(self.services.keys())[i]
-                        failed_services.append(service_name)
-                        logger.error(f"❌ Service {service_name} has stopped unexpectedly")
+                failed_services, self.failed_services = self.failed_services, []
+                for service_name in failed_services:
+                    logger.error(f"❌ Service {service_name} has stopped unexpectedly")
                 
                 if failed_services:
                     logger.error(f"Failed services detected: {failed_services}")
@@ -253,22 +322,27 @@ class SystemLauncher:
     def shutdown(self):
         """Shutdown all services gracefully"""
         logger.info("🛑 Shutting down all services...")
+        self.stopping.set()
         
-        for i, process in enumerate(self.processes):
-            service_name = list(self.services.keys())[i]
-            
-            if process.poll() is None:
-                logger.info(f"Stopping {service_name}...")
-                process.terminate()
-                
-                # Wait for graceful shutdown
-                try:
-                    process.wait(timeout=10)
-                    logger.info(f"✅ {service_name} stopped gracefully")
-                except subprocess.TimeoutExpired:
-                    logger.warning(f"⚠️ Force killing {service_name}")
-                    process.kill()
-                    process.wait()
+        running = {
+            service_name: process for service_name, process in self.processes.items()
+            if process.poll() is None
+        }
+        
+        for service_name, process in running.items():
+            logger.info(f"Stopping {service_name}...")
+            process.terminate()
+        
+        # Every service got SIGTERM at once, so they share one grace period
+        deadline = time.monotonic() + SHUTDOWN_TIMEOUT
+        for service_name, process in running.items():
+            try:
+                process.wait(timeout=max(deadline - time.monotonic(), 0))
+                logger.info(f"✅ {service_name} stopped gracefully")
+            except subprocess.TimeoutExpired:
+                logger.warning(f"⚠️ Force killing {service_name}")
+                process.kill()
+                process.wait()
         
         self.processes.clear()
         logger.info("🔚 All services stopped")
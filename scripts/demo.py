@@ -167,8 +167,9 @@ def demo_blockchain_transaction():
             
             # Monitor job progress
             print("\n🔍 Monitoring transaction progress...")
-            max_attempts = 15
-            for attempt in range(max_attempts):
+            deadline = time.monotonic() + 30
+            last_status = None
+            while time.monotonic() < deadline:
                 time.sleep(2)
                 
                 status_response = requests.get(
@@ -180,7 +181,10 @@ def demo_blockchain_transaction():
                     status = status_response.json()
                     current_status = status["status"]
                     
-                    print(f"📊 Attempt {attempt + 1}: Status = {current_status}")
+                    # Only report transitions, not every poll
+                    if current_status != last_status:
+                        print(f"📊 Status = {current_status}")
+                        last_status = current_status
                     
                     if current_status == "completed":
                         print("🎉 Transaction completed successfully!")
@@ -192,9 +196,6 @@ def demo_blockchain_transaction():
                         error = status.get("error", "Unknown error")
                         print(f"💥 Error: {error}")
                         return None
-                
-                if attempt < max_attempts - 1:
-                    print("⏳ Waiting for transaction to complete...")
             
             print("⚠️ Transaction monitoring timed out")
             return None
@@ -17,6 +17,35 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+def read_response(ser, max_wait=3.0, idle=0.5):
+    """Read lines until the Arduino goes quiet, returning as soon as it does"""
+    response = ""
+    deadline = time.monotonic() + max_wait
+    
+    # Block for the first line up to max_wait, then only while lines keep coming
+    timeout = ser.timeout
+    ser.timeout = max_wait
+    try:
+        while time.monotonic() < deadline:
+            line = ser.readline()
+            if not line:
+                break
+            response += line.decode(errors="replace")
+            ser.timeout = idle
+    finally:
+        ser.timeout = timeout
+    
+    return response
+
+def wait_for_ready(ser, max_wait=2.5):
+    """Wait for the sketch's READY line instead of sleeping through the reset"""
+    timeout = ser.timeout
+    ser.timeout = max_wait
+    try:
+        return ser.read_until(b"READY\r\n").endswith(b"READY\r\n")
+    finally:
+        ser.timeout = timeout
+
 def test_arduino_connection(port, baud_rate=9600, timeout=5):
     """Test connection to Arduino"""
     try:
@@ -26,7 +55,8 @@ def test_arduino_connection(port, baud_rate=9600, timeout=5):
             print(f"✅ Connected to Arduino on {port}")
             
             # Wait for Arduino to initialize
-            time.sleep(2)
+            if not wait_for_ready(ser):
+                print("⚠️ No READY banner from Arduino")
             
             # Send test command
             test_command = "STATUS\n"
@@ -34,10 +64,7 @@ def test_arduino_connection(port, baud_rate=9600, timeout=5):
             ser.write(test_command.encode())
             
             # Read response
-            time.sleep(1)
-            response = ""
-            while ser.in_waiting > 0:
-                response += ser.read(ser.in_waiting).decode()
+            response = read_response(ser)
             
             if response:
                 print(f"📥 Arduino response: {response.strip()}")
@@ -64,7 +91,7 @@ def test_arduino_a_workflow():
     
     try:
         with serial.Serial(port, 9600, timeout=5) as ser:
-            time.sleep(2)  # Wait for Arduino initialization
+            wait_for_ready(ser)
             
             # Test commands for Arduino A
             test_commands = [
@@ -107,7 +134,7 @@ def test_arduino_b_workflow():
     
     try:
         with serial.Serial(port, 9600, timeout=5) as ser:
-            time.sleep(2)  # Wait for Arduino initialization
+            wait_for_ready(ser)
             
             # Test commands for Arduino B
             test_commands = [
@@ -173,7 +200,7 @@ def interactive_arduino_test():
         with serial.Serial(port, 9600, timeout=1) as ser:
             print(f"✅ Connected to Arduino on {port}")
             print("Available commands: STATUS, RESET, OFFER:amount:product, CONFIRMED:tx_hash")
-            time.sleep(2)
+            wait_for_ready(ser)
             
             while True:
                 command = input("\nArduino> ").strip()
@@ -189,14 +216,7 @@ def interactive_arduino_test():
                 print(f"📤 Sent: {command}")
                 
                 # Wait and read response
-                time.sleep(1)
-                response = ""
-                start_time = time.time()
-                
-                while time.time() - start_time < 3:  # 3 second timeout
-                    if ser.in_waiting > 0:
-                        response += ser.read(ser.in_waiting).decode()
-                    time.sleep(0.1)
+                response = read_response(ser)
                 
                 if response:
                     print(f"📥 Arduino: {response.strip()}")
@@ -236,7 +256,7 @@ def run_demo_sequence():
         # Send demo sequence to Arduino B
         try:
             with serial.Serial(arduino_b_port, 9600, timeout=5) as ser:
-                time.sleep(2)
+                wait_for_ready(ser)
                 
                 demo_sequence = [
                     ("Offer Received", "OFFER:150.0:Demo Sensor Data"),
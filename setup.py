@@ -89,10 +89,11 @@ def setup_environment_file():
         return True
     
     if env_example.exists():
-        # Copy example to .env
+        # Copy example to .env, owner-only from creation since it holds secrets
         try:
-            import shutil
-            shutil.copy(env_example, env_file)
+            fd = os.open(env_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "wb") as f:
+                f.write(env_example.read_bytes())
             print("✅ Created .env file from .env.example")
             print("📝 Please update .env file with your actual configuration values")
             return True
@@ -4,34 +4,45 @@ AI-powered buyer agent that creates offers and makes intelligent purchasing deci
 """
 
 import asyncio
+import atexit
 import json
 import logging
 import os
+import queue
 import uuid
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
 from typing import Dict, Any, Optional
 
 import requests
 import uvicorn
 from fastapi import FastAPI, HTTPException, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-# Configure logging
-logging.basicConfig(
-    level=getattr(logging, os.getenv("LOG_LEVEL", "INFO")),
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Configure logging through a queue; a listener thread does the stderr writes
+if not logging.getLogger().handlers:
+    log_queue = queue.SimpleQueue()
+    logging.basicConfig(
+        level=getattr(logging, os.getenv("LOG_LEVEL", "INFO")),
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[QueueHandler(log_queue)]
+    )
+    log_listener = QueueListener(log_queue, logging.StreamHandler())
+    log_listener.start()
+    atexit.register(log_listener.stop)
 logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title="Agent A - Buyer Logic",
     description="AI-powered buyer agent for Arduino-to-Cardano system",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Enable CORS
@@ -76,7 +87,7 @@ class BedrockService:
     
     def __init__(self):
         self.use_mock = USE_MOCK_BEDROCK
-        logger.info(f"BedrockService initialized (mock: {self.use_mock})")
+        logger.info("BedrockService initialized (mock: %s)", self.use_mock)
     
     def create_offer_decision(self, trigger: TriggerRequest) -> Dict[str, Any]:
         """Create offer decision using AI logic"""
@@ -88,7 +99,7 @@ class BedrockService:
         try:
             return self._bedrock_offer_decision(trigger)
         except Exception as e:
-            logger.error(f"Bedrock decision failed: {e}")
+            logger.error("Bedrock decision failed: %s", e)
             return self._fallback_offer_decision(trigger)
     
     def _mock_offer_decision(self, trigger: TriggerRequest) -> Dict[str, Any]:
@@ -141,6 +152,9 @@ class BedrockService:
 # Initialize services
 bedrock_service = BedrockService()
 
+# Pooled session so router hand-offs reuse keep-alive connections
+http_session = requests.Session()
+
 # In-memory storage
 active_offers: Dict[str, dict] = {}
 
@@ -162,7 +176,7 @@ async def trigger_offer(trigger: TriggerRequest, background_tasks: BackgroundTas
     Trigger offer creation from Arduino or manual input
     """
     try:
-        logger.info(f"Received trigger: {trigger.trigger_type} for {trigger.product}")
+        logger.info("Received trigger: %s for %s", trigger.trigger_type, trigger.product)
         
         # Get AI decision
         decision_data = bedrock_service.create_offer_decision(trigger)
@@ -200,7 +214,7 @@ async def trigger_offer(trigger: TriggerRequest, background_tasks: BackgroundTas
         )
         
     except Exception as e:
-        logger.error(f"Error processing trigger: {e}")
+        logger.error("Error processing trigger: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/offers")
@@ -260,25 +274,25 @@ async def evaluate_response(decision_req: DecisionRequest):
         }
         
     except Exception as e:
-        logger.error(f"Error evaluating response: {e}")
+        logger.error("Error evaluating response: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
-async def send_offer_to_router(offer: dict):
-    """Send offer to router service"""
+def send_offer_to_router(offer: dict):
+    """Send offer to router service (sync so Starlette runs it in the threadpool)"""
     try:
-        response = requests.post(
+        response = http_session.post(
             f"{ROUTER_URL}/receive_offer",
             json=offer,
             timeout=10
         )
         
         if response.status_code == 200:
-            logger.info(f"Offer {offer['offer_id']} sent to router successfully")
+            logger.info("Offer %s sent to router successfully", offer['offer_id'])
         else:
-            logger.error(f"Failed to send offer to router: {response.status_code}")
+            logger.error("Failed to send offer to router: %s", response.status_code)
             
     except Exception as e:
-        logger.error(f"Error sending offer to router: {e}")
+        logger.error("Error sending offer to router: %s", e)
 
 @app.post("/arduino_trigger")
 async def arduino_trigger(data: dict):
@@ -294,7 +308,7 @@ async def arduino_trigger(data: dict):
 
 if __name__ == "__main__":
     port = int(os.getenv("AGENT_A_PORT", "8001"))
-    logger.info(f"Starting Agent A on port {port}")
+    logger.info("Starting Agent A on port %s", port)
     
     uvicorn.run(
         "agent_a:app",
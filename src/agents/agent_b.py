@@ -3,32 +3,48 @@ Agent B - Seller Logic Service
 Seller agent that evaluates offers and manages transaction confirmations
 """
 
+import atexit
 import json
 import logging
 import os
+import queue
 import time
 import uuid
 from datetime import datetime
-from typing import Dict, Optional
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, List, Optional
 
+import orjson
 import requests
 import serial
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 from dotenv import load_dotenv
+
+from orjson_provider import ORJSONProvider
 import threading
 
 # Load environment variables
 load_dotenv()
 
-# Configure logging
-logging.basicConfig(
-    level=getattr(logging, os.getenv("LOG_LEVEL", "INFO")),
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Configure logging; the stderr writes happen on a listener thread,
+# off the request and monitor threads
+if not logging.getLogger().handlers:
+    log_queue = queue.SimpleQueue()
+    logging.basicConfig(
+        level=getattr(logging, os.getenv("LOG_LEVEL", "INFO")),
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[QueueHandler(log_queue)]
+    )
+    log_listener = QueueListener(log_queue, logging.StreamHandler())
+    log_listener.start()
+    atexit.register(log_listener.stop)
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 CORS(app)
 
 # Configuration
@@ -37,6 +53,26 @@ PAYMENT_SERVICE_URL = f"http://localhost:{os.getenv('PAYMENT_SERVICE_PORT', '800
 ROUTER_URL = f"http://localhost:{os.getenv('ROUTER_PORT', '8003')}"
 ARDUINO_PORT = os.getenv("ARDUINO_B_PORT", "COM4")
 ARDUINO_BAUD_RATE = int(os.getenv("ARDUINO_BAUD_RATE", "9600"))
+TERMINAL_STATUSES = ("completed", "failed")
+MONITOR_TIMEOUT = 300  # seconds to watch a transaction before giving up
+MONITOR_WAIT = 20  # seconds the payment service may hold each status request
+MONITOR_WORKERS = 8  # transactions watched at once; the rest wait in the queue
+try:
+    MAX_TRACKED_TRANSACTIONS = int(os.getenv("MAX_TRACKED_TRANSACTIONS", "1000"))
+except ValueError:
+    MAX_TRACKED_TRANSACTIONS = 1000
+TRANSACTION_LOG = os.getenv("AGENT_B_TRANSACTION_LOG", "")  # JSONL archive of evicted records
+
+# Payment service session: retries only failed connects, which never reached
+# the service, so a payment is never submitted twice
+payment_session = requests.Session()
+payment_session.mount("http://", HTTPAdapter(max_retries=Retry(
+    total=3, connect=3, read=0, status=0, other=0,
+    backoff_factor=0.25, allowed_methods=None
+)))
+
+# Router notifications reuse one keep-alive connection
+router_session = requests.Session()
 
 class AgentB:
     """Seller agent for managing offers and transactions"""
@@ -44,16 +80,19 @@ class AgentB:
     def __init__(self):
         self.cost_threshold = COST_THRESHOLD
         self.pending_transactions = {}
+        # Request and monitor threads insert while others evict or read
+        self.transactions_lock = threading.Lock()
         self.arduino_connection = None
         self.init_arduino()
         
     def init_arduino(self):
         """Initialize Arduino connection"""
         try:
-            self.arduino_connection = serial.Serial(ARDUINO_PORT, ARDUINO_BAUD_RATE, timeout=1)
-            logger.info(f"Arduino B connected on {ARDUINO_PORT}")
+            # write_timeout keeps a stalled display from hanging the request thread
+            self.arduino_connection = serial.Serial(ARDUINO_PORT, ARDUINO_BAUD_RATE, timeout=1, write_timeout=1)
+            logger.info("Arduino B connected on %s", ARDUINO_PORT)
         except Exception as e:
-            logger.warning(f"Could not connect to Arduino B: {e}")
+            logger.warning("Could not connect to Arduino B: %s", e)
             self.arduino_connection = None
     
     def send_to_arduino(self, message: str):
@@ -61,11 +100,11 @@ class AgentB:
         try:
             if self.arduino_connection and self.arduino_connection.is_open:
                 self.arduino_connection.write(f"{message}\n".encode())
-                logger.info(f"Sent to Arduino B: {message}")
+                logger.info("Sent to Arduino B: %s", message)
             else:
-                logger.info(f"Arduino B (simulated): {message}")
+                logger.info("Arduino B (simulated): %s", message)
         except Exception as e:
-            logger.error(f"Error sending to Arduino B: {e}")
+            logger.error("Error sending to Arduino B: %s", e)
     
     def make_decision(self, offer_data: dict) -> dict:
         """
@@ -76,17 +115,17 @@ class AgentB:
             product = offer_data.get('product', 'Unknown Product')
             offer_id = offer_data.get('offer_id', 'unknown')
             
-            logger.info(f"Evaluating offer {offer_id}: {amount} ADA for {product}")
+            logger.info("Evaluating offer %s: %s ADA for %s", offer_id, amount, product)
             
             # Decision logic
             if amount >= self.cost_threshold:
                 decision = "accept"
                 response_message = f"✅ ACCEPTED: {amount} ADA for {product}"
-                logger.info(f"✅ ACCEPTED: Offer {offer_id}")
+                logger.info("✅ ACCEPTED: Offer %s", offer_id)
             else:
                 decision = "reject"
                 response_message = f"❌ REJECTED: {amount} ADA too low (min: {self.cost_threshold})"
-                logger.info(f"❌ REJECTED: Offer {offer_id}")
+                logger.info("❌ REJECTED: Offer %s", offer_id)
             
             return {
                 "decision": decision,
@@ -99,7 +138,7 @@ class AgentB:
             }
             
         except Exception as e:
-            logger.error(f"Error in decision logic: {e}")
+            logger.error("Error in decision logic: %s", e)
             return {
                 "decision": "reject",
                 "error": str(e),
@@ -112,6 +151,8 @@ class AgentB:
         Initiate payment request to blockchain service
         """
         try:
+            # One timestamp so the payment metadata and local record match
+            now = datetime.now().isoformat()
             payment_request = {
                 "from_address": os.getenv("DEFAULT_WALLET_ADDRESS"),
                 "to_address": offer_data.get("buyer_address", os.getenv("DEFAULT_WALLET_ADDRESS")),
@@ -120,14 +161,14 @@ class AgentB:
                     "agent": "agent_b",
                     "offer_id": offer_data.get("offer_id"),
                     "product": offer_data.get("product"),
-                    "timestamp": datetime.now().isoformat()
+                    "timestamp": now
                 }
             }
             
-            logger.info(f"Initiating payment: {payment_request}")
+            logger.info("Initiating payment: %s", payment_request)
             
             # Send to payment service
-            response = requests.post(
+            response = payment_session.post(
                 f"{PAYMENT_SERVICE_URL}/send_payment",
                 json=payment_request,
                 timeout=30
@@ -136,45 +177,87 @@ class AgentB:
             if response.status_code == 200:
                 result = response.json()
                 job_id = result.get("job_id")
-                tx_hash = result.get("transaction_hash", f"mock_tx_{int(time.time())}")
+                # The hash is null until the job submits, so track it by job id meanwhile
+                tx_hash = result.get("transaction_hash") or job_id or f"mock_tx_{int(time.time())}"
                 
                 # Store pending transaction
-                self.pending_transactions[tx_hash] = {
-                    "job_id": job_id,
-                    "status": "pending",
-                    "amount": offer_data.get('amount'),
-                    "product": offer_data.get('product'),
-                    "offer_id": offer_data.get("offer_id"),
-                    "timestamp": datetime.now().isoformat()
-                }
+                with self.transactions_lock:
+                    self.pending_transactions[tx_hash] = {
+                        "job_id": job_id,
+                        "status": "pending",
+                        "amount": offer_data.get('amount'),
+                        "product": offer_data.get('product'),
+                        "offer_id": offer_data.get("offer_id"),
+                        "timestamp": now
+                    }
+                    self.evict_finished_transactions()
                 
-                logger.info(f"Payment initiated: {tx_hash}")
+                logger.info("Payment initiated: %s", tx_hash)
                 return tx_hash
             else:
-                logger.error(f"Payment service error: {response.status_code}")
+                logger.error("Payment service error: %s", response.status_code)
                 return None
                 
         except Exception as e:
-            logger.error(f"Error initiating payment: {e}")
+            logger.error("Error initiating payment: %s", e)
             return None
     
-    def check_transaction_status(self, tx_hash: str) -> dict:
+    def evict_finished_transactions(self):
+        """Drop the oldest finished transactions beyond MAX_TRACKED_TRANSACTIONS (caller holds transactions_lock)"""
+        excess = len(self.pending_transactions) - MAX_TRACKED_TRANSACTIONS
+        if excess <= 0:
+            return
+        
+        # Dicts keep insertion order, so the first finished entries are the oldest
+        evicted = [
+            tx_hash for tx_hash, transaction in self.pending_transactions.items()
+            if transaction.get("status") in TERMINAL_STATUSES
+        ][:excess]
+        
+        if TRANSACTION_LOG and evicted:
+            try:
+                with open(TRANSACTION_LOG, "ab") as f:
+                    f.write(b"".join(
+                        orjson.dumps({"tx_hash": tx_hash, **self.pending_transactions[tx_hash]}) + b"\n"
+                        for tx_hash in evicted
+                    ))
+            except OSError as e:
+                logger.error("Error archiving transactions: %s", e)
+        
+        for tx_hash in evicted:
+            del self.pending_transactions[tx_hash]
+    
+    def check_transaction_status(self, tx_hash: str, wait: float = 0) -> dict:
         """
         Check status of a transaction
+        
+        With wait > 0 the payment service holds the request for up to wait
+        seconds until the job finishes (long-poll).
         """
         try:
-            if tx_hash not in self.pending_transactions:
+            transaction = self.pending_transactions.get(tx_hash)
+            if transaction is None:
                 return {"status": "not_found"}
             
-            transaction = self.pending_transactions[tx_hash]
+            # Terminal states never change; skip the payment service round trip
+            if transaction.get("status") in TERMINAL_STATUSES:
+                return transaction
+            
             job_id = transaction.get("job_id")
             
             if job_id:
                 # Check with payment service
-                response = requests.get(
-                    f"{PAYMENT_SERVICE_URL}/job_status/{job_id}",
-                    timeout=10
-                )
+                if wait > 0:
+                    response = payment_session.get(
+                        f"{PAYMENT_SERVICE_URL}/job_status/{job_id}/wait",
+                        params={"timeout": wait},
+                        timeout=wait + 10
+                    )
+                else:
+                    response = payment_session.get(
+                        f"{PAYMENT_SERVICE_URL}/job_status/{job_id}",
+                        timeout=10
+                    )
                 
                 if response.status_code == 200:
                     job_status = response.json()
@@ -205,14 +288,20 @@ class AgentB:
             return transaction
             
         except Exception as e:
-            logger.error(f"Error checking transaction status: {e}")
+            logger.error("Error checking transaction status: %s", e)
             return {"status": "error", "error": str(e)}
     
     def handle_confirmed_transaction(self, tx_hash: str, transaction: dict):
         """
         Handle confirmed transaction - send to Arduino display
         """
+        # Polling keeps reporting "completed"; only announce a transaction once
+        if transaction.get("confirmed_at"):
+            return
+        
         try:
+            transaction["confirmed_at"] = datetime.now().isoformat()
+            
             amount = transaction.get("amount", 0)
             product = transaction.get("product", "Unknown")
             
@@ -221,13 +310,17 @@ class AgentB:
             self.send_to_arduino(arduino_message)
             
             # Log success
-            logger.info(f"🎉 TRANSACTION CONFIRMED: {tx_hash} - {amount} ADA for {product}")
+            logger.info("🎉 TRANSACTION CONFIRMED: %s - %s ADA for %s", tx_hash, amount, product)
             
-            # Notify router of confirmation
-            self.notify_router_confirmation(tx_hash, transaction)
+            # Notify router in the background so status callers don't wait on it
+            threading.Thread(
+                target=self.notify_router_confirmation,
+                args=(tx_hash, dict(transaction)),
+                daemon=True
+            ).start()
             
         except Exception as e:
-            logger.error(f"Error handling confirmed transaction: {e}")
+            logger.error("Error handling confirmed transaction: %s", e)
     
     def notify_router_confirmation(self, tx_hash: str, transaction: dict):
         """
@@ -244,19 +337,19 @@ class AgentB:
                 "timestamp": datetime.now().isoformat()
             }
             
-            response = requests.post(
+            response = router_session.post(
                 f"{ROUTER_URL}/transaction_confirmed",
                 json=confirmation_data,
                 timeout=10
             )
             
             if response.status_code == 200:
-                logger.info(f"Router notified of confirmation: {tx_hash}")
+                logger.info("Router notified of confirmation: %s", tx_hash)
             else:
-                logger.error(f"Failed to notify router: {response.status_code}")
+                logger.error("Failed to notify router: %s", response.status_code)
                 
         except Exception as e:
-            logger.error(f"Error notifying router: {e}")
+            logger.error("Error notifying router: %s", e)
 
 # Initialize Agent B
 agent_b = AgentB()
@@ -267,7 +360,7 @@ def health_check():
     return jsonify({
         "service": "Agent B - Seller Logic",
         "status": "healthy",
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": datetime.now(),
         "version": "1.0.0",
         "cost_threshold": agent_b.cost_threshold,
         "arduino_connected": agent_b.arduino_connection is not None
@@ -280,7 +373,7 @@ def respond_to_offer():
     """
     try:
         offer_data = request.get_json()
-        logger.info(f"Received offer: {offer_data}")
+        logger.info("Received offer: %s", offer_data)
         
         # Make decision
         decision = agent_b.make_decision(offer_data)
@@ -291,17 +384,13 @@ def respond_to_offer():
             decision["tx_hash"] = tx_hash
             
             if tx_hash:
-                # Start monitoring transaction in background
-                threading.Thread(
-                    target=monitor_transaction,
-                    args=(tx_hash,),
-                    daemon=True
-                ).start()
+                # Monitor transaction in background
+                schedule_monitor(tx_hash)
         
         return jsonify(decision)
         
     except Exception as e:
-        logger.error(f"Error responding to offer: {e}")
+        logger.error("Error responding to offer: %s", e)
         return jsonify({"error": str(e)}), 500
 
 @app.route('/transaction_status/<tx_hash>')
@@ -313,7 +402,7 @@ def get_transaction_status(tx_hash):
         status = agent_b.check_transaction_status(tx_hash)
         return jsonify(status)
     except Exception as e:
-        logger.error(f"Error getting transaction status: {e}")
+        logger.error("Error getting transaction status: %s", e)
         return jsonify({"error": str(e)}), 500
 
 @app.route('/transactions')
@@ -321,7 +410,9 @@ def get_all_transactions():
     """
     Get all pending transactions
     """
-    return jsonify({"transactions": agent_b.pending_transactions})
+    with agent_b.transactions_lock:
+        transactions = dict(agent_b.pending_transactions)
+    return jsonify({"transactions": transactions})
 
 @app.route('/confirm_tx', methods=['POST'])
 def confirm_transaction():
@@ -332,8 +423,8 @@ def confirm_transaction():
         data = request.get_json()
         tx_hash = data.get("tx_hash")
         
-        if tx_hash in agent_b.pending_transactions:
-            transaction = agent_b.pending_transactions[tx_hash]
+        transaction = agent_b.pending_transactions.get(tx_hash)
+        if transaction is not None:
             transaction["status"] = "completed"
             agent_b.handle_confirmed_transaction(tx_hash, transaction)
             
@@ -342,40 +433,65 @@ def confirm_transaction():
             return jsonify({"error": "Transaction not found"}), 404
             
     except Exception as e:
-        logger.error(f"Error confirming transaction: {e}")
+        logger.error("Error confirming transaction: %s", e)
         return jsonify({"error": str(e)}), 500
 
+# Bounded pool of monitor threads; each holds a long-poll connection open
+monitor_queue: "queue.Queue[str]" = queue.Queue()
+_monitor_workers: List[threading.Thread] = []
+_monitor_lock = threading.Lock()
+
+def monitor_worker():
+    """Watch queued transactions one at a time"""
+    while True:
+        tx_hash = monitor_queue.get()
+        try:
+            monitor_transaction(tx_hash)
+        finally:
+            monitor_queue.task_done()
+
+def schedule_monitor(tx_hash: str):
+    """Queue a transaction for monitoring, starting the workers on first use"""
+    with _monitor_lock:
+        if not _monitor_workers:
+            for _ in range(MONITOR_WORKERS):
+                worker = threading.Thread(target=monitor_worker, daemon=True)
+                worker.start()
+                _monitor_workers.append(worker)
+    monitor_queue.put(tx_hash)
+
 def monitor_transaction(tx_hash: str):
     """
     Background task to monitor transaction status
     """
-    max_attempts = 30  # 5 minutes with 10-second intervals
+    deadline = time.monotonic() + MONITOR_TIMEOUT
     attempt = 0
     
-    while attempt < max_attempts:
+    while time.monotonic() < deadline:
         try:
-            status = agent_b.check_transaction_status(tx_hash)
+            # The payment service holds this request until the job finishes
+            status = agent_b.check_transaction_status(tx_hash, wait=MONITOR_WAIT)
             
             if status.get("status") == "completed":
-                logger.info(f"Transaction {tx_hash} confirmed after {attempt} attempts")
-                break
+                logger.info("Transaction %s confirmed after %s attempts", tx_hash, attempt)
+                return
             elif status.get("status") == "failed":
-                logger.error(f"Transaction {tx_hash} failed")
-                break
+                logger.error("Transaction %s failed", tx_hash)
+                return
             
-            time.sleep(10)  # Wait 10 seconds before next check
+            # Short regular interval; also paces retries if the service is down
+            time.sleep(1)
             attempt += 1
             
         except Exception as e:
-            logger.error(f"Error monitoring transaction {tx_hash}: {e}")
-            break
+            logger.error("Error monitoring transaction %s: %s", tx_hash, e)
+            return
     
-    if attempt >= max_attempts:
-        logger.warning(f"Transaction {tx_hash} monitoring timed out")
+    logger.warning("Transaction %s monitoring timed out", tx_hash)
 
 if __name__ == "__main__":
     port = int(os.getenv("AGENT_B_PORT", "8002"))
-    logger.info(f"Starting Agent B on port {port}")
+    logger.info("Starting Agent B on port %s", port)
     
     app.run(
         host="0.0.0.0",
@@ -3,40 +3,98 @@ Router Service - Traffic Controller
 Coordinates communication between Agent A, Agent B, and Arduino devices
 """
 
+import atexit
 import json
 import logging
 import os
+import queue
+import threading
+import time
 import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import Dict, List, Optional
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, List, Optional, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 from dotenv import load_dotenv
 
+from orjson_provider import ORJSONProvider
+
 # Load environment variables
 load_dotenv()
 
-# Configure logging
-logging.basicConfig(
-    level=getattr(logging, os.getenv("LOG_LEVEL", "INFO")),
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Configure logging; request threads only enqueue records and a
+# listener thread writes them out
+if not logging.getLogger().handlers:
+    log_queue = queue.SimpleQueue()
+    logging.basicConfig(
+        level=getattr(logging, os.getenv("LOG_LEVEL", "INFO")),
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[QueueHandler(log_queue)]
+    )
+    log_listener = QueueListener(log_queue, logging.StreamHandler())
+    log_listener.start()
+    atexit.register(log_listener.stop)
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 CORS(app)
 
 # Configuration
 AGENT_A_URL = f"http://localhost:{os.getenv('AGENT_A_PORT', '8001')}"
 AGENT_B_URL = f"http://localhost:{os.getenv('AGENT_B_PORT', '8002')}"
 PAYMENT_SERVICE_URL = f"http://localhost:{os.getenv('PAYMENT_SERVICE_PORT', '8000')}"
+try:
+    STATUS_CACHE_TTL = float(os.getenv("STATUS_CACHE_TTL", "5"))  # seconds
+except ValueError:
+    STATUS_CACHE_TTL = 5.0
+try:
+    MAX_STORED_RECORDS = int(os.getenv("ROUTER_MAX_RECORDS", "1000"))  # per store
+except ValueError:
+    MAX_STORED_RECORDS = 1000
+
+# Pooled session: keep-alive connections to the agents, sized for the threaded server
+http_session = requests.Session()
+http_session.mount("http://", HTTPAdapter(pool_maxsize=20))
 
 # In-memory stores
 offers_store: Dict[str, dict] = {}
-responses_store: Dict[str, dict] = {}
-transaction_store: Dict[str, dict] = {}
+# Responses and transactions are write-once records; the oldest are dropped past MAX_STORED_RECORDS
+responses_store: Dict[str, dict] = OrderedDict()
+transaction_store: Dict[str, dict] = OrderedDict()
+
+store_lock = threading.Lock()
+
+def store_bounded(store: OrderedDict, key: str, record: dict):
+    """Insert a record as the newest entry, dropping the oldest beyond MAX_STORED_RECORDS"""
+    with store_lock:
+        store[key] = record
+        store.move_to_end(key)
+        while len(store) > MAX_STORED_RECORDS:
+            store.popitem(last=False)
+
+def probe_service(url: str) -> dict:
+    """Check whether a service answers on its health endpoint"""
+    try:
+        # (connect, read) - local services refuse or answer quickly
+        response = http_session.get(f"{url}/", timeout=(2, 5))
+        return {
+            "status": "online" if response.status_code == 200 else "error",
+            "response_time": response.elapsed.total_seconds(),
+            "url": url
+        }
+    except Exception as e:
+        return {
+            "status": "offline",
+            "error": str(e),
+            "url": url
+        }
 
 class RouterService:
     """Main router service for coordinating agent communications"""
@@ -45,6 +103,8 @@ class RouterService:
         self.offers = offers_store
         self.responses = responses_store
         self.transactions = transaction_store
+        # (checked_at, agents_status) - avoids re-probing every service per /status call
+        self._agents_status_cache: Optional[Tuple[float, dict]] = None
         
     def create_offer(self, offer_data: dict) -> str:
         """Create and store a new offer"""
@@ -59,7 +119,7 @@ class RouterService:
         # Store offer
         self.offers[offer_id] = offer_data
         
-        logger.info(f"Created offer {offer_id}: {offer_data.get('amount')} ADA for {offer_data.get('product')}")
+        logger.info("Created offer %s: %s ADA for %s", offer_id, offer_data.get('amount'), offer_data.get('product'))
         return offer_id
     
     def get_offer(self, offer_id: str) -> Optional[dict]:
@@ -68,19 +128,21 @@ class RouterService:
     
     def update_offer_status(self, offer_id: str, status: str, metadata: dict = None):
         """Update offer status"""
-        if offer_id in self.offers:
-            self.offers[offer_id]['status'] = status
-            self.offers[offer_id]['updated_at'] = datetime.now(timezone.utc).isoformat()
+        offer = self.offers.get(offer_id)
+        if offer is not None:
+            offer['status'] = status
+            offer['updated_at'] = datetime.now(timezone.utc).isoformat()
             if metadata:
-                self.offers[offer_id].update(metadata)
-            logger.info(f"Updated offer {offer_id} status to {status}")
+                offer.update(metadata)
+            logger.info("Updated offer %s status to %s", offer_id, status)
     
     def route_offer_to_agent_b(self, offer_data: dict) -> dict:
         """Route offer to Agent B for evaluation"""
+        offer_id = offer_data.get('offer_id')
         try:
-            logger.info(f"Routing offer {offer_data.get('offer_id')} to Agent B")
+            logger.info("Routing offer %s to Agent B", offer_id)
             
-            response = requests.post(
+            response = http_session.post(
                 f"{AGENT_B_URL}/respond",
                 json=offer_data,
                 timeout=30
@@ -93,31 +155,31 @@ class RouterService:
                 response_id = str(uuid.uuid4())
                 response_data['response_id'] = response_id
                 response_data['timestamp'] = datetime.now().isoformat()
-                self.responses[response_id] = response_data
+                store_bounded(self.responses, response_id, response_data)
                 
                 # Update offer status
-                offer_id = offer_data.get('offer_id')
+                decision = response_data.get('decision')
                 if offer_id:
                     self.update_offer_status(
                         offer_id, 
-                        response_data.get('decision', 'unknown'),
+                        decision or 'unknown',
                         {'agent_b_response': response_data}
                     )
                 
-                logger.info(f"Agent B responded: {response_data.get('decision')} for offer {offer_id}")
+                logger.info("Agent B responded: %s for offer %s", decision, offer_id)
                 return response_data
             else:
-                logger.error(f"Agent B error: {response.status_code}")
+                logger.error("Agent B error: %s", response.status_code)
                 return {"decision": "error", "error": f"Agent B returned {response.status_code}"}
                 
         except Exception as e:
-            logger.error(f"Error routing to Agent B: {e}")
+            logger.error("Error routing to Agent B: %s", e)
             return {"decision": "error", "error": str(e)}
     
     def notify_agent_a_response(self, offer_id: str, response_data: dict):
         """Notify Agent A of Agent B's response"""
         try:
-            logger.info(f"Notifying Agent A of response for offer {offer_id}")
+            logger.info("Notifying Agent A of response for offer %s", offer_id)
             
             evaluation_request = {
                 "offer_id": offer_id,
@@ -125,7 +187,7 @@ class RouterService:
                 "context": {"agent_b_response": response_data}
             }
             
-            response = requests.post(
+            response = http_session.post(
                 f"{AGENT_A_URL}/evaluate_response",
                 json=evaluation_request,
                 timeout=30
@@ -133,32 +195,52 @@ class RouterService:
             
             if response.status_code == 200:
                 evaluation = response.json()
-                logger.info(f"Agent A evaluation: {evaluation.get('status')} for offer {offer_id}")
+                status = evaluation.get('status')
+                logger.info("Agent A evaluation: %s for offer %s", status, offer_id)
                 
                 # Update offer with final status
                 self.update_offer_status(
                     offer_id,
-                    evaluation.get('status', 'unknown'),
+                    status or 'unknown',
                     {'agent_a_evaluation': evaluation}
                 )
                 
                 return evaluation
             else:
-                logger.error(f"Agent A evaluation error: {response.status_code}")
+                logger.error("Agent A evaluation error: %s", response.status_code)
                 return None
                 
         except Exception as e:
-            logger.error(f"Error notifying Agent A: {e}")
+            logger.error("Error notifying Agent A: %s", e)
             return None
     
+    def get_agents_status(self) -> dict:
+        """Probe agent connectivity (cached for STATUS_CACHE_TTL seconds)"""
+        cached = self._agents_status_cache
+        if cached and time.monotonic() - cached[0] < STATUS_CACHE_TTL:
+            return cached[1]
+        
+        # Probe all services concurrently so /status costs one timeout, not three
+        services = [("agent_a", AGENT_A_URL), ("agent_b", AGENT_B_URL), ("payment_service", PAYMENT_SERVICE_URL)]
+        with ThreadPoolExecutor(max_workers=len(services)) as pool:
+            results = pool.map(probe_service, [url for _, url in services])
+            agents_status = {name: result for (name, _), result in zip(services, results)}
+        
+        self._agents_status_cache = (time.monotonic(), agents_status)
+        return agents_status
+    
+    def invalidate_agents_status(self):
+        """Drop cached connectivity so the next /status call re-probes"""
+        self._agents_status_cache = None
+    
     def record_transaction(self, tx_data: dict):
         """Record transaction details"""
         tx_id = tx_data.get('tx_hash') or str(uuid.uuid4())
         tx_data['tx_id'] = tx_id
         tx_data['recorded_at'] = datetime.now().isoformat()
         
-        self.transactions[tx_id] = tx_data
-        logger.info(f"Recorded transaction: {tx_id}")
+        store_bounded(self.transactions, tx_id, tx_data)
+        logger.info("Recorded transaction: %s", tx_id)
 
 # Initialize router service
 router_service = RouterService()
@@ -169,7 +251,7 @@ def health_check():
     return jsonify({
         "service": "Router - Traffic Controller",
         "status": "healthy",
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": datetime.now(),
         "version": "1.0.0",
         "agents": {
             "agent_a_url": AGENT_A_URL,
@@ -190,7 +272,7 @@ def receive_offer():
     """
     try:
         offer_data = request.get_json()
-        logger.info(f"Received offer from Agent A: {offer_data}")
+        logger.info("Received offer from Agent A: %s", offer_data)
         
         # Validate offer data
         required_fields = ['offer_id', 'amount', 'agent_id']
@@ -206,7 +288,8 @@ def receive_offer():
         
         # If Agent B accepts, transaction will be initiated by Agent B
         # If Agent B rejects or counters, notify Agent A
-        if response_data.get('decision') in ['reject', 'counter_offer']:
+        decision = response_data.get('decision')
+        if decision in ('reject', 'counter_offer'):
             evaluation = router_service.notify_agent_a_response(offer_id, response_data)
             response_data['agent_a_evaluation'] = evaluation
         
@@ -214,11 +297,11 @@ def receive_offer():
             "status": "routed",
             "offer_id": offer_id,
             "agent_b_response": response_data,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": datetime.now()
         })
         
     except Exception as e:
-        logger.error(f"Error receiving offer: {e}")
+        logger.error("Error receiving offer: %s", e)
         return jsonify({"error": str(e)}), 500
 
 @app.route('/transaction_confirmed', methods=['POST'])
@@ -228,7 +311,7 @@ def transaction_confirmed():
     """
     try:
         tx_data = request.get_json()
-        logger.info(f"Transaction confirmed: {tx_data}")
+        logger.info("Transaction confirmed: %s", tx_data)
         
         # Record transaction
         router_service.record_transaction(tx_data)
@@ -245,11 +328,11 @@ def transaction_confirmed():
         return jsonify({
             "status": "recorded",
             "tx_hash": tx_data.get('tx_hash'),
-            "timestamp": datetime.now().isoformat()
+            "timestamp": datetime.now()
         })
         
     except Exception as e:
-        logger.error(f"Error recording transaction confirmation: {e}")
+        logger.error("Error recording transaction confirmation: %s", e)
         return jsonify({"error": str(e)}), 500
 
 @app.route('/offers')
@@ -289,26 +372,11 @@ def get_system_status():
     """Get comprehensive system status"""
     
     # Check agent connectivity
-    agents_status = {}
-    
-    for agent_name, url in [("agent_a", AGENT_A_URL), ("agent_b", AGENT_B_URL), ("payment_service", PAYMENT_SERVICE_URL)]:
-        try:
-            response = requests.get(f"{url}/", timeout=5)
-            agents_status[agent_name] = {
-                "status": "online" if response.status_code == 200 else "error",
-                "response_time": response.elapsed.total_seconds(),
-                "url": url
-            }
-        except Exception as e:
-            agents_status[agent_name] = {
-                "status": "offline",
-                "error": str(e),
-                "url": url
-            }
+    agents_status = router_service.get_agents_status()
     
     return jsonify({
         "router_status": "healthy",
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": datetime.now(),
         "agents": agents_status,
         "system_stats": {
             "total_offers": len(router_service.offers),
@@ -327,10 +395,10 @@ def arduino_trigger():
     """
     try:
         arduino_data = request.get_json()
-        logger.info(f"Arduino trigger received: {arduino_data}")
+        logger.info("Arduino trigger received: %s", arduino_data)
         
         # Forward to Agent A
-        response = requests.post(
+        response = http_session.post(
             f"{AGENT_A_URL}/arduino_trigger",
             json=arduino_data,
             timeout=30
@@ -343,13 +411,13 @@ def arduino_trigger():
             return jsonify({
                 "status": "forwarded",
                 "agent_a_response": agent_a_response,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": datetime.now()
             })
         else:
             return jsonify({"error": f"Agent A error: {response.status_code}"}), 500
             
     except Exception as e:
-        logger.error(f"Error processing Arduino trigger: {e}")
+        logger.error("Error processing Arduino trigger: %s", e)
         return jsonify({"error": str(e)}), 500
 
 @app.route('/reset', methods=['POST'])
@@ -358,16 +426,17 @@ def reset_system():
     router_service.offers.clear()
     router_service.responses.clear()
     router_service.transactions.clear()
+    router_service.invalidate_agents_status()
     
     logger.info("System data reset")
     return jsonify({
         "status": "reset",
-        "timestamp": datetime.now().isoformat()
+        "timestamp": datetime.now()
     })
 
 if __name__ == "__main__":
     port = int(os.getenv("ROUTER_PORT", "8003"))
-    logger.info(f"Starting Router service on port {port}")
+    logger.info("Starting Router service on port %s", port)
     
     app.run(
         host="0.0.0.0",
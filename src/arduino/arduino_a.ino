@@ -70,6 +70,7 @@ void setup() {
   Serial.println("- TX:tx_hash - Transaction confirmed");
   Serial.println("- RESET - Reset system");
   Serial.println("=================================");
+  Serial.println("READY");
   
   delay(2000);
   updateDisplay();
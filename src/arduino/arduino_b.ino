@@ -88,6 +88,7 @@ void setup() {
   Serial.println("- HISTORY - Show transaction history");
   Serial.println("- RESET - Reset display");
   Serial.println("=======================================");
+  Serial.println("READY");
   
   delay(3000);
   currentState = IDLE;
@@ -4,34 +4,63 @@ Handles real Cardano blockchain transactions via Blockfrost API
 """
 
 import asyncio
-import json
+import atexit
 import os
+import queue
+import random
+import secrets
+import time
 import uuid
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
-from typing import Dict, Optional, Any
+from typing import Dict, Optional, Any, Tuple
 import logging
+from logging.handlers import QueueHandler, QueueListener
 
-import requests
+import httpx
+import orjson
 import uvicorn
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, Response
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-# Configure logging
-logging.basicConfig(
-    level=getattr(logging, os.getenv("LOG_LEVEL", "INFO")),
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Configure logging: records are formatted on the event loop but written
+# to stderr by a listener thread, so a slow console never stalls requests
+if not logging.getLogger().handlers:
+    log_queue = queue.SimpleQueue()
+    logging.basicConfig(
+        level=getattr(logging, os.getenv("LOG_LEVEL", "INFO")),
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[QueueHandler(log_queue)]
+    )
+    log_listener = QueueListener(log_queue, logging.StreamHandler())
+    log_listener.start()
+    atexit.register(log_listener.stop)
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the shared Blockfrost connection pool for the app lifetime"""
+    payment_service.blockfrost.open()
+    # Warm in the background so an unreachable Blockfrost doesn't delay startup
+    warm_up = asyncio.ensure_future(payment_service.blockfrost.warm_up())
+    pruner = asyncio.ensure_future(prune_jobs_periodically())
+    yield
+    warm_up.cancel()
+    pruner.cancel()
+    await payment_service.blockfrost.aclose()
+
 app = FastAPI(
     title="Cardano Payment Service",
     description="Blockchain payment service for Arduino-to-Cardano AI Agents",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Enable CORS
@@ -48,6 +77,23 @@ BLOCKFROST_PROJECT_ID = os.getenv("BLOCKFROST_PROJECT_ID", "")
 BLOCKFROST_BASE_URL = os.getenv("BLOCKFROST_BASE_URL", "https://cardano-preprod.blockfrost.io/api/v0")
 CARDANO_NETWORK = os.getenv("CARDANO_NETWORK", "preprod")
 MOCK_MODE = os.getenv("MOCK_MODE", "true").lower() == "true"
+try:
+    NETWORK_INFO_CACHE_TTL = float(os.getenv("NETWORK_INFO_CACHE_TTL", "300"))  # seconds
+except ValueError:
+    NETWORK_INFO_CACHE_TTL = 300.0
+try:
+    BLOCKFROST_KEEPALIVE_EXPIRY = float(os.getenv("BLOCKFROST_KEEPALIVE_EXPIRY", "60"))  # seconds
+except ValueError:
+    BLOCKFROST_KEEPALIVE_EXPIRY = 60.0
+try:
+    JOB_RETENTION_SECONDS = float(os.getenv("JOB_RETENTION_SECONDS", "86400"))
+except ValueError:
+    JOB_RETENTION_SECONDS = 86400.0
+JOB_PRUNE_INTERVAL = 3600  # seconds
+BLOCKFROST_MAX_CONCURRENCY = 8  # in-flight requests per process
+BLOCKFROST_MAX_RETRIES = 3
+BLOCKFROST_RETRY_DELAY = 0.5  # seconds, doubled per retry plus jitter
+TERMINAL_JOB_STATUSES = ("completed", "failed")
 
 # Pydantic models
 class PaymentRequest(BaseModel):
@@ -85,29 +131,107 @@ class BlockfrostClient:
         }
         self.enabled = bool(self.project_id and self.project_id != "your_blockfrost_project_id_here")
         
+        # (fetched_at, network_info) - network parameters change rarely
+        self._network_info_cache: Optional[Tuple[float, dict]] = None
+        
+        # Pooled client shared by all calls; opened by the app lifespan or on first use
+        self._client: Optional[httpx.AsyncClient] = None
+        # Created on first use so it binds to the running event loop
+        self._limiter: Optional[asyncio.Semaphore] = None
+        
         if self.enabled:
             logger.info("Blockfrost client initialized with real API")
         else:
             logger.info("Blockfrost client in mock mode - no real transactions")
     
-    def get_network_info(self) -> dict:
-        """Get Cardano network information"""
+    def open(self):
+        """Create the pooled HTTP client so keep-alive connections are reused"""
+        if self._client is None:
+            # HTTP/2 lets concurrent lookups share one TLS connection
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=self.headers,
+                # Fail fast on an unreachable host; allow slower reads
+                timeout=httpx.Timeout(10.0, connect=3.0, pool=2.0),
+                http2=True,
+                # httpx drops idle connections after 5s by default, forcing a new
+                # DNS lookup and TLS handshake on the next call
+                limits=httpx.Limits(keepalive_expiry=BLOCKFROST_KEEPALIVE_EXPIRY)
+            )
+    
+    async def aclose(self):
+        """Close pooled connections and drop cached data"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        self._limiter = None
+        self.invalidate_network_info()
+    
+    async def _request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        """Send a request with bounded concurrency, retrying transient GET failures"""
+        # Calls made outside the app lifespan (scripts, tests) open the pool on demand
+        if self._client is None:
+            self.open()
+        if self._limiter is None:
+            self._limiter = asyncio.Semaphore(BLOCKFROST_MAX_CONCURRENCY)
+        
+        # Only reads are retried; resending a submit is not known to be safe
+        retries = BLOCKFROST_MAX_RETRIES if method == "GET" else 0
+        
+        for attempt in range(retries + 1):
+            try:
+                async with self._limiter:
+                    response = await self._client.request(method, path, **kwargs)
+                if response.status_code < 500 or response.status_code == 501 or attempt == retries:
+                    return response
+            except httpx.TransportError:
+                if attempt == retries:
+                    raise
+            
+            await asyncio.sleep(BLOCKFROST_RETRY_DELAY * 2 ** attempt * (1 + random.random()))
+    
+    def invalidate_network_info(self):
+        """Drop the cached network info so the next call refetches it"""
+        self._network_info_cache = None
+    
+    def network_info_age(self) -> Optional[float]:
+        """Seconds since network info was fetched, or None if not cached"""
+        cached = self._network_info_cache
+        if cached is None:
+            return None
+        return time.monotonic() - cached[0]
+    
+    async def warm_up(self):
+        """Connect ahead of the first request and prime the network info cache"""
+        if not self.enabled:
+            return
+        
+        try:
+            await self.get_network_info()
+            logger.info("Blockfrost connection warmed up")
+        except Exception as e:
+            logger.warning("Blockfrost warm-up failed: %s", e)
+    
+    async def get_network_info(self) -> dict:
+        """Get Cardano network information (cached for NETWORK_INFO_CACHE_TTL seconds)"""
         if not self.enabled:
             return {"network": "mock", "status": "active"}
         
+        cached = self._network_info_cache
+        if cached and time.monotonic() - cached[0] < NETWORK_INFO_CACHE_TTL:
+            return cached[1]
+        
         try:
-            response = requests.get(
-                f"{self.base_url}/network",
-                headers=self.headers,
-                timeout=10
-            )
+            response = await self._request("GET", "/network")
             response.raise_for_status()
-            return response.json()
+            network_info = orjson.loads(response.content)
+            self._network_info_cache = (time.monotonic(), network_info)
+            return network_info
         except Exception as e:
-            logger.error(f"Failed to get network info: {e}")
+            logger.error("Failed to get network info: %s", e)
             raise
     
-    def get_address_info(self, address: str) -> dict:
+    async def get_address_info(self, address: str) -> dict:
         """Get address information"""
         if not self.enabled:
             return {
@@ -118,39 +242,31 @@ class BlockfrostClient:
             }
         
         try:
-            response = requests.get(
-                f"{self.base_url}/addresses/{address}",
-                headers=self.headers,
-                timeout=10
-            )
+            response = await self._request("GET", f"/addresses/{address}")
             response.raise_for_status()
-            return response.json()
+            return orjson.loads(response.content)
         except Exception as e:
-            logger.error(f"Failed to get address info for {address}: {e}")
+            logger.error("Failed to get address info for %s: %s", address, e)
             raise
     
-    def submit_transaction(self, tx_data: dict) -> dict:
+    async def submit_transaction(self, tx_data: dict) -> dict:
         """Submit transaction to Cardano network"""
         if not self.enabled:
             # Mock transaction submission
-            mock_tx_hash = f"mock_tx_{uuid.uuid4().hex[:16]}"
-            logger.info(f"Mock transaction submitted: {mock_tx_hash}")
+            mock_tx_hash = f"mock_tx_{secrets.token_hex(8)}"
+            logger.info("Mock transaction submitted: %s", mock_tx_hash)
             return {
                 "hash": mock_tx_hash,
                 "status": "submitted"
             }
         
         try:
-            response = requests.post(
-                f"{self.base_url}/tx/submit",
-                headers=self.headers,
-                json=tx_data,
-                timeout=30
-            )
+            # Content-Type is already set on the pooled client
+            response = await self._request("POST", "/tx/submit", content=orjson.dumps(tx_data))
             response.raise_for_status()
-            return response.json()
+            return orjson.loads(response.content)
         except Exception as e:
-            logger.error(f"Failed to submit transaction: {e}")
+            logger.error("Failed to submit transaction: %s", e)
             raise
 
 class PaymentService:
@@ -161,7 +277,7 @@ class PaymentService:
         self.active_jobs: Dict[str, dict] = {}
         self.mock_mode = MOCK_MODE or not self.blockfrost.enabled
         
-        logger.info(f"Payment service initialized (mock: {self.mock_mode})")
+        logger.info("Payment service initialized (mock: %s)", self.mock_mode)
     
     def create_payment_job(self, payment_request: PaymentRequest) -> str:
         """Create a new payment job"""
@@ -178,18 +294,19 @@ class PaymentService:
             raise ValueError("Amount must be at least 1 ADA (1,000,000 lovelace)")
         
         # Create job
+        now = datetime.now().isoformat()
         job = {
             "job_id": job_id,
             "status": "pending",
             "payment_request": payment_request.dict(),
-            "created_at": datetime.now().isoformat(),
-            "updated_at": datetime.now().isoformat(),
+            "created_at": now,
+            "updated_at": now,
             "transaction_hash": None,
             "error": None
         }
         
         self.active_jobs[job_id] = job
-        logger.info(f"Created payment job {job_id}: {payment_request.amount} lovelace")
+        logger.info("Created payment job %s: %s lovelace", job_id, payment_request.amount)
         
         return job_id
     
@@ -209,7 +326,7 @@ class PaymentService:
     async def process_payment(self, job_id: str):
         """Process payment asynchronously"""
         if job_id not in self.active_jobs:
-            logger.error(f"Job {job_id} not found")
+            logger.error("Job %s not found", job_id)
             return
         
         job = self.active_jobs[job_id]
@@ -225,16 +342,15 @@ class PaymentService:
                 await asyncio.sleep(2)  # Simulate processing time
                 
                 # Simulate random success/failure (90% success rate)
-                import random
                 if random.random() < 0.9:
-                    tx_hash = f"mock_tx_{uuid.uuid4().hex[:16]}"
+                    tx_hash = f"mock_tx_{secrets.token_hex(8)}"
                     job["status"] = "completed"
                     job["transaction_hash"] = tx_hash
-                    logger.info(f"Mock payment completed: {tx_hash}")
+                    logger.info("Mock payment completed: %s", tx_hash)
                 else:
                     job["status"] = "failed"
                     job["error"] = "Mock payment failure for testing"
-                    logger.error(f"Mock payment failed for job {job_id}")
+                    logger.error("Mock payment failed for job %s", job_id)
             else:
                 # Real blockchain processing
                 tx_result = await self._submit_real_transaction(payment_req)
@@ -242,11 +358,11 @@ class PaymentService:
                 if tx_result.get("hash"):
                     job["status"] = "completed"
                     job["transaction_hash"] = tx_result["hash"]
-                    logger.info(f"Real payment completed: {tx_result['hash']}")
+                    logger.info("Real payment completed: %s", tx_result['hash'])
                 else:
                     job["status"] = "failed"
                     job["error"] = "Transaction submission failed"
-                    logger.error(f"Real payment failed for job {job_id}")
+                    logger.error("Real payment failed for job %s", job_id)
             
             job["updated_at"] = datetime.now().isoformat()
             
@@ -254,7 +370,7 @@ class PaymentService:
             job["status"] = "failed"
             job["error"] = str(e)
             job["updated_at"] = datetime.now().isoformat()
-            logger.error(f"Payment processing error for job {job_id}: {e}")
+            logger.error("Payment processing error for job %s: %s", job_id, e)
     
     async def _submit_real_transaction(self, payment_req: PaymentRequest) -> dict:
         """Submit real transaction to Cardano blockchain"""
@@ -265,7 +381,7 @@ class PaymentService:
         
         try:
             # Get address info to verify balance
-            from_addr_info = self.blockfrost.get_address_info(payment_req.from_address)
+            from_addr_info = await self.blockfrost.get_address_info(payment_req.from_address)
             
             # Check balance (simplified)
             balance = 0
@@ -280,18 +396,45 @@ class PaymentService:
             # For now, return mock transaction as real implementation
             # requires complex transaction building
             logger.warning("Real transaction building not implemented - using mock")
-            tx_hash = f"real_mock_tx_{uuid.uuid4().hex[:16]}"
+            tx_hash = f"real_mock_tx_{secrets.token_hex(8)}"
             
             return {"hash": tx_hash, "status": "submitted"}
             
         except Exception as e:
-            logger.error(f"Real transaction error: {e}")
+            logger.error("Real transaction error: %s", e)
             raise
     
     def get_job_status(self, job_id: str) -> Optional[dict]:
         """Get job status"""
         return self.active_jobs.get(job_id)
     
+    async def wait_for_job(self, job_id: str, timeout: float) -> Optional[dict]:
+        """Wait until a job finishes or the timeout expires, then return it"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        delay = 0.1
+        
+        while True:
+            job = self.active_jobs.get(job_id)
+            remaining = deadline - loop.time()
+            if not job or job["status"] in TERMINAL_JOB_STATUSES or remaining <= 0:
+                return job
+            
+            await asyncio.sleep(min(delay, remaining))
+            delay = min(delay * 1.5, 2.0)
+    
+    def prune_jobs(self, max_age: float) -> int:
+        """Drop finished jobs not updated for max_age seconds, return how many"""
+        cutoff = datetime.now() - timedelta(seconds=max_age)
+        expired = [
+            job_id for job_id, job in self.active_jobs.items()
+            if job["status"] in TERMINAL_JOB_STATUSES
+            and datetime.fromisoformat(job["updated_at"]) < cutoff
+        ]
+        for job_id in expired:
+            del self.active_jobs[job_id]
+        return len(expired)
+    
     def get_all_jobs(self) -> Dict[str, dict]:
         """Get all jobs"""
         return self.active_jobs
@@ -299,11 +442,34 @@ class PaymentService:
 # Initialize payment service
 payment_service = PaymentService()
 
+async def prune_jobs_periodically():
+    """Keep the in-memory job store from growing for the life of the process"""
+    while True:
+        await asyncio.sleep(JOB_PRUNE_INTERVAL)
+        pruned = payment_service.prune_jobs(JOB_RETENTION_SECONDS)
+        if pruned:
+            logger.info("Pruned %d finished payment jobs", pruned)
+
+# Static liveness body, serialized once
+_HEALTH_BYTES = orjson.dumps({"service": "Cardano Payment Service", "status": "healthy"})
+
+@app.get("/health")
+async def liveness():
+    """Liveness probe - no Blockfrost lookup, use / for full status"""
+    return Response(content=_HEALTH_BYTES, media_type="application/json")
+
 @app.get("/")
 async def health_check():
-    """Health check endpoint"""
+    """
+    Health check endpoint
+    
+    network_info may be served from cache for up to NETWORK_INFO_CACHE_TTL
+    seconds, so a healthy status does not prove Blockfrost is reachable right
+    now; network_info_age reports how old the data is.
+    """
     try:
-        network_info = payment_service.blockfrost.get_network_info()
+        network_info = await payment_service.blockfrost.get_network_info()
+        network_info_age = payment_service.blockfrost.network_info_age()
         
         return {
             "service": "Cardano Payment Service",
@@ -313,6 +479,7 @@ async def health_check():
             "network": CARDANO_NETWORK,
             "blockfrost_enabled": payment_service.blockfrost.enabled,
             "network_info": network_info,
+            "network_info_age": round(network_info_age, 1) if network_info_age is not None else None,
             "active_jobs": len(payment_service.active_jobs),
             "timestamp": datetime.now().isoformat()
         }
@@ -348,7 +515,7 @@ async def send_payment(payment_request: PaymentRequest, background_tasks: Backgr
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        logger.error(f"Payment error: {e}")
+        logger.error("Payment error: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @app.get("/job_status/{job_id}", response_model=JobStatus)
@@ -363,6 +530,21 @@ async def get_job_status(job_id: str):
     
     return JobStatus(**job)
 
+@app.get("/job_status/{job_id}/wait", response_model=JobStatus)
+async def wait_for_job_status(job_id: str, timeout: float = Query(30.0, gt=0, le=120)):
+    """
+    Long-poll a payment job until it completes or fails
+    
+    Returns the current state if the job is still running when timeout
+    seconds have passed, so clients can simply call again.
+    """
+    job = await payment_service.wait_for_job(job_id, timeout)
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return JobStatus(**job)
+
 @app.get("/jobs")
 async def get_all_jobs():
     """
@@ -379,10 +561,10 @@ async def get_address_info(address: str):
     Get Cardano address information
     """
     try:
-        info = payment_service.blockfrost.get_address_info(address)
+        info = await payment_service.blockfrost.get_address_info(address)
         return info
     except Exception as e:
-        logger.error(f"Error getting address info: {e}")
+        logger.error("Error getting address info: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
 
 @app.post("/test_payment")
@@ -404,7 +586,7 @@ async def test_payment():
 
 if __name__ == "__main__":
     port = int(os.getenv("PAYMENT_SERVICE_PORT", "8000"))
-    logger.info(f"Starting Payment Service on port {port}")
+    logger.info("Starting Payment Service on port %s", port)
     
     uvicorn.run(
         "payment_service:app",
@@ -0,0 +1,12 @@
+"""
+Shared helpers for the unit tests
+"""
+
+from unittest import mock
+
+
+def make_response(payload, status_code=200):
+    response = mock.Mock()
+    response.status_code = status_code
+    response.json.return_value = payload
+    return response
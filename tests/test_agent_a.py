@@ -0,0 +1,34 @@
+"""
+Unit tests for Agent A (no running services required)
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+# Add service directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "agents"))
+
+import agent_a  # noqa: E402
+
+
+class TestAgentA:
+    """Test offer creation and forwarding"""
+
+    def test_router_send_does_not_block_event_loop(self):
+        # Blocking requests.post must run in the threadpool, not on the loop
+        assert not asyncio.iscoroutinefunction(agent_a.send_offer_to_router)
+
+    def test_trigger_forwards_offer_to_router(self):
+        client = TestClient(agent_a.app)
+        with mock.patch.object(agent_a.http_session, "post", return_value=mock.Mock(status_code=200)) as post:
+            response = client.post("/trigger", json={"trigger_type": "manual", "amount": 150.0, "product": "Sensor Data"})
+
+        assert response.status_code == 200
+        offer_id = response.json()["offer_id"]
+        post.assert_called_once()
+        assert post.call_args[0][0].endswith("/receive_offer")
+        assert post.call_args[1]["json"]["offer_id"] == offer_id
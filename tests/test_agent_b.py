@@ -0,0 +1,193 @@
+"""
+Unit tests for Agent B (no running services required)
+"""
+
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+# Add service directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "agents"))
+
+import agent_b  # noqa: E402
+from conftest import make_response  # noqa: E402
+
+
+class InlineThread:
+    """Stand-in for threading.Thread that runs the target on start()"""
+
+    def __init__(self, target, args=(), daemon=None):
+        self.target = target
+        self.args = args
+
+    def start(self):
+        self.target(*self.args)
+
+
+class TestAgentB:
+    """Test transaction tracking and confirmation"""
+
+    @pytest.fixture(autouse=True)
+    def reset_transactions(self):
+        agent_b.agent_b.pending_transactions.clear()
+        yield
+        agent_b.agent_b.pending_transactions.clear()
+
+    def add_transaction(self, tx_hash="tx_1", **fields):
+        transaction = {"job_id": "job_1", "status": "pending", "amount": 150.0, "product": "Sensor Data", "offer_id": "offer_1"}
+        transaction.update(fields)
+        agent_b.agent_b.pending_transactions[tx_hash] = transaction
+        return transaction
+
+    def test_confirmation_announced_once(self):
+        self.add_transaction()
+        completed = make_response({"status": "completed", "transaction_hash": "tx_1"})
+
+        with mock.patch.object(agent_b.payment_session, "get", return_value=completed), \
+                mock.patch.object(agent_b.router_session, "post", return_value=make_response({})) as post, \
+                mock.patch.object(agent_b.agent_b, "send_to_arduino") as arduino, \
+                mock.patch.object(agent_b.threading, "Thread", InlineThread):
+            agent_b.agent_b.check_transaction_status("tx_1")
+            agent_b.agent_b.check_transaction_status("tx_1")
+
+        arduino.assert_called_once_with("tx_1:CONFIRMED")
+        post.assert_called_once()
+        assert post.call_args[0][0].endswith("/transaction_confirmed")
+
+    def test_terminal_status_skips_payment_service(self):
+        self.add_transaction(status="completed", confirmed_at="2024-01-01T00:00:00")
+
+        with mock.patch.object(agent_b.payment_session, "get") as get:
+            status = agent_b.agent_b.check_transaction_status("tx_1")
+
+        get.assert_not_called()
+        assert status["status"] == "completed"
+
+    def test_pending_status_polls_payment_service(self):
+        self.add_transaction()
+
+        with mock.patch.object(agent_b.payment_session, "get", return_value=make_response({"status": "processing"})) as get:
+            status = agent_b.agent_b.check_transaction_status("tx_1")
+
+        get.assert_called_once()
+        assert get.call_args[0][0].endswith("/job_status/job_1")
+        assert status["status"] == "processing"
+
+    def test_confirm_does_not_wait_for_router(self):
+        self.add_transaction()
+        notified = threading.Event()
+
+        def slow_post(*args, **kwargs):
+            time.sleep(0.5)
+            notified.set()
+            return make_response({})
+
+        client = agent_b.app.test_client()
+        with mock.patch.object(agent_b.router_session, "post", side_effect=slow_post), \
+                mock.patch.object(agent_b.agent_b, "send_to_arduino"):
+            started = time.perf_counter()
+            response = client.post("/confirm_tx", json={"tx_hash": "tx_1"})
+            elapsed = time.perf_counter() - started
+            assert notified.wait(2)
+
+        assert response.status_code == 200
+        assert elapsed < 0.5
+
+    def test_wait_uses_payment_long_poll(self):
+        self.add_transaction()
+
+        with mock.patch.object(agent_b.payment_session, "get", return_value=make_response({"status": "processing"})) as get:
+            agent_b.agent_b.check_transaction_status("tx_1", wait=20)
+
+        assert get.call_args[0][0].endswith("/job_status/job_1/wait")
+        assert get.call_args[1]["params"] == {"timeout": 20}
+        assert get.call_args[1]["timeout"] > 20
+
+    def test_monitor_stops_when_completed(self):
+        self.add_transaction()
+        statuses = [{"status": "processing"}, {"status": "completed"}]
+
+        with mock.patch.object(agent_b.agent_b, "check_transaction_status", side_effect=statuses) as check, \
+                mock.patch.object(agent_b.time, "sleep") as sleep:
+            agent_b.monitor_transaction("tx_1")
+
+        assert check.call_count == 2
+        check.assert_called_with("tx_1", wait=agent_b.MONITOR_WAIT)
+        sleep.assert_called_once()
+
+    def test_stalled_display_write_is_bounded(self):
+        with mock.patch.object(agent_b.serial, "Serial") as serial_port, \
+                mock.patch.object(agent_b.agent_b, "arduino_connection"):
+            agent_b.agent_b.init_arduino()
+
+        assert serial_port.call_args[1]["write_timeout"] == 1
+
+    def test_monitors_are_bounded(self):
+        running = []
+        peak = []
+        release = threading.Event()
+
+        def fake_monitor(tx_hash):
+            running.append(tx_hash)
+            peak.append(len(running))
+            release.wait(2)
+            running.remove(tx_hash)
+
+        with mock.patch.object(agent_b, "monitor_transaction", side_effect=fake_monitor):
+            for i in range(agent_b.MONITOR_WORKERS * 2):
+                agent_b.schedule_monitor(f"tx_{i}")
+            time.sleep(0.2)
+            in_flight = len(running)
+            release.set()
+            agent_b.monitor_queue.join()
+
+        assert in_flight == agent_b.MONITOR_WORKERS
+        assert max(peak) == agent_b.MONITOR_WORKERS
+
+    def test_evicts_oldest_finished_transactions(self, tmp_path):
+        log = tmp_path / "transactions.jsonl"
+        self.add_transaction("tx_old", status="completed")
+        self.add_transaction("tx_pending")
+        self.add_transaction("tx_failed", status="failed")
+        self.add_transaction("tx_new", status="completed")
+
+        with mock.patch.object(agent_b, "MAX_TRACKED_TRANSACTIONS", 2), \
+                mock.patch.object(agent_b, "TRANSACTION_LOG", str(log)):
+            agent_b.agent_b.evict_finished_transactions()
+
+        assert list(agent_b.agent_b.pending_transactions) == ["tx_pending", "tx_new"]
+        archived = [json.loads(line) for line in log.read_text().splitlines()]
+        assert [record["tx_hash"] for record in archived] == ["tx_old", "tx_failed"]
+
+    def test_pending_transactions_are_never_evicted(self):
+        self.add_transaction("tx_1")
+        self.add_transaction("tx_2")
+
+        with mock.patch.object(agent_b, "MAX_TRACKED_TRANSACTIONS", 1):
+            agent_b.agent_b.evict_finished_transactions()
+
+        assert len(agent_b.agent_b.pending_transactions) == 2
+
+    def test_accepted_offer_is_monitored_by_job_id(self):
+        queued = make_response({"job_id": "job_1", "status": "queued", "transaction_hash": None})
+        offer = {"offer_id": "offer_1", "amount": 150.0, "product": "Sensor Data"}
+
+        with mock.patch.object(agent_b.payment_session, "post", return_value=queued), \
+                mock.patch.object(agent_b, "schedule_monitor") as schedule_monitor:
+            response = agent_b.app.test_client().post("/respond", json=offer)
+
+        assert response.get_json()["tx_hash"] == "job_1"
+        schedule_monitor.assert_called_once_with("job_1")
+        assert agent_b.agent_b.pending_transactions["job_1"]["job_id"] == "job_1"
+
+    def test_payment_calls_retry_connect_errors_only(self):
+        retries = agent_b.payment_session.get_adapter("http://localhost:8000").max_retries
+
+        assert retries.connect == 3
+        assert retries.read == 0
+        assert retries.status == 0
@@ -0,0 +1,181 @@
+"""
+Unit tests for the system launcher (no running services required)
+"""
+
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import main  # noqa: E402
+
+
+@pytest.fixture
+def launcher():
+    with mock.patch.object(main.signal, "signal"):
+        yield main.SystemLauncher()
+
+
+def spec(launcher, name):
+    return next(service for service in launcher.services if service.name == name)
+
+
+@pytest.fixture
+def listener():
+    with socket.socket() as sock:
+        sock.bind(("0.0.0.0", 0))
+        sock.listen()
+        yield sock.getsockname()[1]
+
+
+@pytest.fixture(autouse=True)
+def no_backoff():
+    with mock.patch.object(main, "HEALTH_CHECK_BACKOFF", 0):
+        yield
+
+
+class TestHealthChecks:
+    """Test service health checks"""
+
+    def test_retries_until_service_answers(self, launcher):
+        session = mock.Mock()
+        session.get.side_effect = [ConnectionError("refused"), mock.Mock(status_code=503), mock.Mock(status_code=200)]
+
+        assert launcher.check_service_health(spec(launcher, "router"), session)
+        assert session.get.call_count == 3
+
+    def test_gives_up_after_max_attempts(self, launcher):
+        session = mock.Mock()
+        session.get.side_effect = ConnectionError("refused")
+
+        assert not launcher.check_service_health(spec(launcher, "router"), session)
+        assert session.get.call_count == main.HEALTH_CHECK_ATTEMPTS
+
+
+class TestPortCheck:
+    """Test the pre-flight port availability check"""
+
+    def test_free_ports_pass(self, launcher):
+        launcher.services = tuple(service._replace(port=0) for service in launcher.services)
+
+        assert launcher.check_ports()
+
+    def test_port_in_use_fails(self, launcher, listener):
+        launcher.services = tuple(
+            service._replace(port=listener if service.name == "router" else 0)
+            for service in launcher.services
+        )
+
+        assert not launcher.check_ports()
+
+
+class TestReadiness:
+    """Test waiting for a started service to listen"""
+
+    def test_returns_once_port_accepts(self, launcher, listener):
+        process = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+        try:
+            assert launcher.wait_until_listening(listener, process)
+        finally:
+            process.kill()
+            process.wait()
+
+    def test_stops_waiting_when_process_exits(self, launcher):
+        process = subprocess.Popen([sys.executable, "-c", "pass"])
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            closed_port = sock.getsockname()[1]
+
+        started = time.monotonic()
+        assert not launcher.wait_until_listening(closed_port, process)
+        assert time.monotonic() - started < main.SERVICE_START_TIMEOUT
+
+
+class TestServiceWatch:
+    """Test exit detection for started services"""
+
+    def test_exit_is_reported(self, launcher):
+        process = subprocess.Popen([sys.executable, "-c", "pass"])
+        launcher.register_service(spec(launcher, "router"), process)
+
+        assert launcher.service_exited.wait(timeout=5)
+        assert launcher.failed_services == ["router"]
+
+    def test_exit_during_shutdown_is_ignored(self, launcher):
+        launcher.stopping.set()
+        process = subprocess.Popen([sys.executable, "-c", "pass"])
+        launcher.watch_service("router", process)
+
+        assert not launcher.service_exited.is_set()
+        assert launcher.failed_services == []
+
+
+class TestOutputForwarding:
+    """Test that service output is drained and prefixed"""
+
+    def test_lines_are_prefixed_with_service_name(self, launcher, capsys):
+        process = subprocess.Popen(
+            [sys.executable, "-c", "import sys; print('one'); sys.stdout.buffer.write(b'tw\\xff\\n')"],
+            stdout=subprocess.PIPE
+        )
+        launcher.forward_output("router", process.stdout)
+        process.wait()
+
+        assert capsys.readouterr().out == "[router] one\n[router] tw\ufffd\n"
+
+
+class TestDependencyCheck:
+    """Test the pre-flight dependency check"""
+
+    def test_installed_dependencies_pass(self, launcher):
+        assert launcher.check_dependencies()
+
+    def test_missing_module_reported_by_package_name(self, launcher, caplog):
+        real_find_spec = main.importlib.util.find_spec
+
+        def find_spec(name):
+            return None if name == "serial" else real_find_spec(name)
+
+        with mock.patch.object(main.importlib.util, "find_spec", side_effect=find_spec):
+            assert not launcher.check_dependencies()
+
+        assert "pyserial" in caplog.text
+
+
+class TestShutdown:
+    """Test stopping the started services"""
+
+    def test_stops_every_running_service(self, launcher):
+        for name in ("router", "agent_b"):
+            process = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+            launcher.register_service(spec(launcher, name), process)
+        processes = dict(launcher.processes)
+
+        launcher.shutdown()
+
+        assert all(process.poll() is not None for process in processes.values())
+        assert launcher.processes == {}
+        assert launcher.failed_services == []
+
+    def test_stubborn_services_share_one_grace_period(self, launcher):
+        ignore_term = "import signal, time; signal.signal(signal.SIGTERM, signal.SIG_IGN); print(flush=True); time.sleep(30)"
+        for name in ("router", "agent_b"):
+            process = subprocess.Popen([sys.executable, "-c", ignore_term], stdout=subprocess.PIPE)
+            process.stdout.readline()  # SIGTERM handler is installed
+            launcher.register_service(spec(launcher, name), process)
+        processes = dict(launcher.processes)
+
+        with mock.patch.object(main, "SHUTDOWN_TIMEOUT", 0.5):
+            started = time.monotonic()
+            launcher.shutdown()
+            elapsed = time.monotonic() - started
+
+        assert all(process.poll() is not None for process in processes.values())
+        assert elapsed < 0.9
@@ -0,0 +1,351 @@
+"""
+Unit tests for the payment service (no running services required)
+"""
+
+import asyncio
+import json
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest import mock
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+# Add service directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "blockchain"))
+
+import payment_service  # noqa: E402
+from payment_service import BlockfrostClient, PaymentService, NETWORK_INFO_CACHE_TTL  # noqa: E402
+
+NETWORK_INFO = {"supply": {"max": "45000000000000000"}}
+
+
+class FakeBlockfrost:
+    """Mock transport recording the requests it serves"""
+
+    def __init__(self, fail=False, statuses=()):
+        self.fail = fail
+        self.statuses = list(statuses)
+        self.requests = []
+
+    def __call__(self, request):
+        self.requests.append(request)
+        if self.fail:
+            raise httpx.ConnectError("unreachable", request=request)
+        if self.statuses:
+            return httpx.Response(self.statuses.pop(0), json={})
+        return httpx.Response(200, json=NETWORK_INFO)
+
+
+@pytest.fixture(autouse=True)
+def no_retry_delay():
+    with mock.patch.object(payment_service, "BLOCKFROST_RETRY_DELAY", 0):
+        yield
+
+
+def make_client(transport):
+    client = BlockfrostClient()
+    client.enabled = True
+    client._client = httpx.AsyncClient(
+        base_url=client.base_url,
+        headers=client.headers,
+        transport=httpx.MockTransport(transport)
+    )
+    return client
+
+
+class TestNetworkInfoCache:
+    """Test BlockfrostClient network info caching"""
+
+    def test_hit_within_ttl_skips_http(self):
+        fake = FakeBlockfrost()
+        client = make_client(fake)
+
+        async def scenario():
+            with mock.patch.object(payment_service.time, "monotonic", return_value=100.0) as clock:
+                assert await client.get_network_info() == NETWORK_INFO
+                clock.return_value = 100.0 + NETWORK_INFO_CACHE_TTL - 1
+                assert await client.get_network_info() == NETWORK_INFO
+            await client.aclose()
+
+        asyncio.run(scenario())
+        assert len(fake.requests) == 1
+        assert fake.requests[0].url.path.endswith("/api/v0/network")
+        assert fake.requests[0].headers["project_id"] == client.project_id
+
+    def test_expired_entry_refetches(self):
+        fake = FakeBlockfrost()
+        client = make_client(fake)
+
+        async def scenario():
+            with mock.patch.object(payment_service.time, "monotonic", return_value=100.0) as clock:
+                await client.get_network_info()
+                clock.return_value = 100.0 + NETWORK_INFO_CACHE_TTL + 1
+                await client.get_network_info()
+            await client.aclose()
+
+        asyncio.run(scenario())
+        assert len(fake.requests) == 2
+
+    def test_failed_fetch_is_not_cached(self):
+        failing = FakeBlockfrost(fail=True)
+        client = make_client(failing)
+
+        async def scenario():
+            with pytest.raises(httpx.ConnectError):
+                await client.get_network_info()
+            assert client.network_info_age() is None
+
+            fake = FakeBlockfrost()
+            client._client = httpx.AsyncClient(base_url=client.base_url, transport=httpx.MockTransport(fake))
+            assert await client.get_network_info() == NETWORK_INFO
+            await client.aclose()
+            return fake
+
+        fake = asyncio.run(scenario())
+        assert len(fake.requests) == 1
+
+    def test_invalidate_forces_refetch(self):
+        fake = FakeBlockfrost()
+        client = make_client(fake)
+
+        async def scenario():
+            await client.get_network_info()
+            client.invalidate_network_info()
+            await client.get_network_info()
+            await client.aclose()
+
+        asyncio.run(scenario())
+        assert len(fake.requests) == 2
+
+    def test_aclose_drops_cache(self):
+        client = make_client(FakeBlockfrost())
+
+        async def scenario():
+            await client.get_network_info()
+            await client.aclose()
+
+        asyncio.run(scenario())
+        assert client.network_info_age() is None
+        assert client._client is None
+
+    def test_mock_mode_skips_cache_and_http(self):
+        client = BlockfrostClient()
+        client.enabled = False
+
+        assert asyncio.run(client.get_network_info()) == {"network": "mock", "status": "active"}
+        assert client.network_info_age() is None
+        assert client._client is None
+
+    def test_warm_up_primes_cache(self):
+        fake = FakeBlockfrost()
+        client = make_client(fake)
+
+        async def scenario():
+            await client.warm_up()
+            await client.get_network_info()
+            await client.aclose()
+
+        asyncio.run(scenario())
+        assert len(fake.requests) == 1
+
+    def test_warm_up_failure_is_swallowed(self):
+        client = make_client(FakeBlockfrost(fail=True))
+
+        async def scenario():
+            await client.warm_up()
+            await client.aclose()
+
+        asyncio.run(scenario())
+        assert client.network_info_age() is None
+
+
+class TestRetries:
+    """Test retry and concurrency limits on Blockfrost requests"""
+
+    def test_get_retries_server_errors(self):
+        fake = FakeBlockfrost(statuses=[503, 502])
+        client = make_client(fake)
+
+        async def scenario():
+            info = await client.get_network_info()
+            await client.aclose()
+            return info
+
+        assert asyncio.run(scenario()) == NETWORK_INFO
+        assert len(fake.requests) == 3
+
+    def test_get_gives_up_after_max_retries(self):
+        fake = FakeBlockfrost(fail=True)
+        client = make_client(fake)
+
+        async def scenario():
+            with pytest.raises(httpx.ConnectError):
+                await client.get_network_info()
+            await client.aclose()
+
+        asyncio.run(scenario())
+        assert len(fake.requests) == payment_service.BLOCKFROST_MAX_RETRIES + 1
+
+    def test_client_errors_are_not_retried(self):
+        fake = FakeBlockfrost(statuses=[404])
+        client = make_client(fake)
+
+        async def scenario():
+            with pytest.raises(httpx.HTTPStatusError):
+                await client.get_address_info("addr_test1xyz")
+            await client.aclose()
+
+        asyncio.run(scenario())
+        assert len(fake.requests) == 1
+
+    def test_submit_is_not_retried(self):
+        fake = FakeBlockfrost(statuses=[503])
+        client = make_client(fake)
+
+        async def scenario():
+            with pytest.raises(httpx.HTTPStatusError):
+                await client.submit_transaction({"tx": "abc"})
+            await client.aclose()
+
+        asyncio.run(scenario())
+        assert len(fake.requests) == 1
+
+    def test_concurrency_is_bounded(self):
+        in_flight = []
+        peak = []
+
+        async def handler(request):
+            in_flight.append(request)
+            peak.append(len(in_flight))
+            await asyncio.sleep(0.01)
+            in_flight.pop()
+            return httpx.Response(200, json={})
+
+        client = BlockfrostClient()
+        client.enabled = True
+        client._client = httpx.AsyncClient(base_url=client.base_url, transport=httpx.MockTransport(handler))
+
+        async def scenario():
+            await asyncio.gather(*[client.get_address_info(f"addr_test1_{i}") for i in range(20)])
+            await client.aclose()
+
+        asyncio.run(scenario())
+        assert max(peak) == payment_service.BLOCKFROST_MAX_CONCURRENCY
+
+
+class TestWaitForJob:
+    """Test long-polling of payment jobs"""
+
+    def test_returns_when_job_finishes(self):
+        service = PaymentService()
+        service.active_jobs["job_1"] = {"job_id": "job_1", "status": "processing"}
+
+        async def finish_later():
+            await asyncio.sleep(0.2)
+            service.active_jobs["job_1"]["status"] = "completed"
+
+        async def scenario():
+            task = asyncio.ensure_future(finish_later())
+            job = await service.wait_for_job("job_1", timeout=5)
+            await task
+            return job
+
+        assert asyncio.run(scenario())["status"] == "completed"
+
+    def test_timeout_returns_current_state(self):
+        service = PaymentService()
+        service.active_jobs["job_1"] = {"job_id": "job_1", "status": "processing"}
+
+        job = asyncio.run(service.wait_for_job("job_1", timeout=0.2))
+        assert job["status"] == "processing"
+
+    def test_unknown_job_returns_none(self):
+        assert asyncio.run(PaymentService().wait_for_job("missing", timeout=5)) is None
+
+
+class TestSubmitTransaction:
+    """Test transaction submission to Blockfrost"""
+
+    def test_payload_sent_as_json(self):
+        fake = FakeBlockfrost()
+        client = make_client(fake)
+
+        async def scenario():
+            await client.submit_transaction({"tx": "abc", "amount": 2000000})
+            await client.aclose()
+
+        asyncio.run(scenario())
+        request = fake.requests[0]
+        assert request.url.path.endswith("/api/v0/tx/submit")
+        assert request.headers["content-type"] == "application/json"
+        assert request.headers["project_id"] == client.project_id
+        assert json.loads(request.content) == {"tx": "abc", "amount": 2000000}
+
+
+class TestPruneJobs:
+    """Test eviction of finished payment jobs"""
+
+    def test_prunes_only_old_finished_jobs(self):
+        service = PaymentService()
+        old = (datetime.now() - timedelta(hours=2)).isoformat()
+        recent = datetime.now().isoformat()
+        service.active_jobs = {
+            "old_done": {"status": "completed", "updated_at": old},
+            "old_failed": {"status": "failed", "updated_at": old},
+            "old_running": {"status": "processing", "updated_at": old},
+            "new_done": {"status": "completed", "updated_at": recent},
+        }
+
+        assert service.prune_jobs(3600) == 2
+        assert set(service.active_jobs) == {"old_running", "new_done"}
+
+
+class TestLiveness:
+    """Test the static liveness endpoint"""
+
+    def test_health_skips_blockfrost(self):
+        client = TestClient(payment_service.app)
+        with mock.patch.object(payment_service.payment_service.blockfrost, "get_network_info") as network_info:
+            response = client.get("/health")
+
+        network_info.assert_not_called()
+        assert response.status_code == 200
+        assert response.json() == {"service": "Cardano Payment Service", "status": "healthy"}
+
+
+class TestConnectionPool:
+    """Test the pooled Blockfrost client settings"""
+
+    def test_open_configures_pool(self):
+        client = BlockfrostClient()
+        client.open()
+
+        pool = client._client._transport._pool
+        assert pool._keepalive_expiry == payment_service.BLOCKFROST_KEEPALIVE_EXPIRY
+        assert pool._http2
+        assert client._client.timeout.connect == 3.0
+        assert client._client.timeout.read == 10.0
+        asyncio.run(client.aclose())
+
+    def test_request_outside_lifespan_opens_client(self):
+        fake = FakeBlockfrost()
+        client = BlockfrostClient()
+        client.enabled = True
+        real_async_client = httpx.AsyncClient
+
+        def async_client(**kwargs):
+            return real_async_client(transport=httpx.MockTransport(fake), **kwargs)
+
+        async def run():
+            try:
+                return await client.get_network_info()
+            finally:
+                await client.aclose()
+
+        with mock.patch.object(payment_service.httpx, "AsyncClient", side_effect=async_client):
+            assert asyncio.run(run()) == NETWORK_INFO
+
+        assert len(fake.requests) == 1
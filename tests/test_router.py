@@ -0,0 +1,145 @@
+"""
+Unit tests for the router service (no running services required)
+"""
+
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+# Add service directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "agents"))
+
+import orjson_provider  # noqa: E402
+import router  # noqa: E402
+from conftest import make_response  # noqa: E402
+
+
+OFFER = {"offer_id": "offer_1", "agent_id": "agent_a", "amount": 150.0, "product": "Sensor Data"}
+
+
+class TestRouterService:
+    """Test offer routing and decision handling"""
+
+    @pytest.fixture(autouse=True)
+    def reset_stores(self):
+        router.router_service.offers.clear()
+        router.router_service.responses.clear()
+        router.router_service.transactions.clear()
+        router.router_service.invalidate_agents_status()
+        yield
+        router.router_service.offers.clear()
+        router.router_service.responses.clear()
+        router.router_service.transactions.clear()
+        router.router_service.invalidate_agents_status()
+
+    @pytest.fixture
+    def client(self):
+        return router.app.test_client()
+
+    def test_accept_updates_offer_without_notifying_agent_a(self, client):
+        with mock.patch.object(router.http_session, "post", return_value=make_response({"decision": "accept"})) as post:
+            response = client.post("/receive_offer", json=dict(OFFER))
+
+        assert response.status_code == 200
+        assert response.get_json()["agent_b_response"]["decision"] == "accept"
+        assert post.call_count == 1
+        assert post.call_args[0][0].endswith("/respond")
+        assert router.router_service.offers["offer_1"]["status"] == "accept"
+
+    def test_reject_notifies_agent_a(self, client):
+        responses = [
+            make_response({"decision": "reject"}),
+            make_response({"status": "reject", "offer_id": "offer_1"}),
+        ]
+        with mock.patch.object(router.http_session, "post", side_effect=responses) as post:
+            response = client.post("/receive_offer", json=dict(OFFER))
+
+        data = response.get_json()
+        assert post.call_count == 2
+        assert post.call_args[0][0].endswith("/evaluate_response")
+        assert data["agent_b_response"]["agent_a_evaluation"]["status"] == "reject"
+        assert router.router_service.offers["offer_1"]["status"] == "reject"
+
+    def test_agent_b_error_status(self, client):
+        with mock.patch.object(router.http_session, "post", return_value=make_response({}, status_code=503)):
+            response = client.post("/receive_offer", json=dict(OFFER))
+
+        assert response.get_json()["agent_b_response"]["decision"] == "error"
+
+    def test_missing_field_rejected(self, client):
+        with mock.patch.object(router.http_session, "post") as post:
+            response = client.post("/receive_offer", json={"offer_id": "offer_1", "amount": 1})
+
+        assert response.status_code == 400
+        post.assert_not_called()
+
+    def test_status_reports_agents_and_counts(self, client):
+        router.router_service.offers["a"] = {"status": "pending"}
+        router.router_service.offers["b"] = {"status": "completed"}
+        router.router_service.offers["c"] = {"status": "pending"}
+
+        with mock.patch.object(router.http_session, "get", return_value=mock.Mock(status_code=200, elapsed=mock.Mock(total_seconds=lambda: 0.01))):
+            response = client.get("/status")
+
+        data = response.get_json()
+        assert set(data["agents"]) == {"agent_a", "agent_b", "payment_service"}
+        assert all(agent["status"] == "online" for agent in data["agents"].values())
+        assert data["system_stats"]["total_offers"] == 3
+        assert data["system_stats"]["pending_offers"] == 2
+        assert data["system_stats"]["completed_offers"] == 1
+
+    def test_status_reports_offline_agents(self, client):
+        with mock.patch.object(router.http_session, "get", side_effect=ConnectionError("refused")):
+            response = client.get("/status")
+
+        assert all(agent["status"] == "offline" for agent in response.get_json()["agents"].values())
+
+    def test_status_probes_are_cached(self, client):
+        online = mock.Mock(status_code=200, elapsed=mock.Mock(total_seconds=lambda: 0.01))
+        with mock.patch.object(router.http_session, "get", return_value=online) as get:
+            client.get("/status")
+            client.get("/status")
+
+        assert get.call_count == 3
+
+    def test_expired_status_cache_reprobes(self, client):
+        online = mock.Mock(status_code=200, elapsed=mock.Mock(total_seconds=lambda: 0.01))
+        with mock.patch.object(router.http_session, "get", return_value=online) as get, \
+                mock.patch.object(router.time, "monotonic", return_value=100.0) as clock:
+            client.get("/status")
+            clock.return_value = 100.0 + router.STATUS_CACHE_TTL + 1
+            client.get("/status")
+
+        assert get.call_count == 6
+
+    def test_status_probes_run_concurrently(self, client):
+        def slow_get(url, timeout):
+            time.sleep(0.3)
+            return mock.Mock(status_code=200, elapsed=mock.Mock(total_seconds=lambda: 0.3))
+
+        with mock.patch.object(router.http_session, "get", side_effect=slow_get):
+            started = time.perf_counter()
+            response = client.get("/status")
+            elapsed = time.perf_counter() - started
+
+        assert all(agent["status"] == "online" for agent in response.get_json()["agents"].values())
+        assert elapsed < 0.6
+
+    def test_json_served_by_orjson(self, client):
+        with mock.patch.object(orjson_provider.orjson, "dumps", wraps=orjson_provider.orjson.dumps) as dumps:
+            response = client.get("/")
+
+        dumps.assert_called_once()
+        assert datetime.fromisoformat(response.get_json()["timestamp"])
+
+    def test_transaction_store_drops_oldest_records(self):
+        with mock.patch.object(router, "MAX_STORED_RECORDS", 2):
+            for tx_hash in ("tx_1", "tx_2", "tx_3"):
+                router.router_service.record_transaction({"tx_hash": tx_hash})
+            router.router_service.record_transaction({"tx_hash": "tx_2", "status": "again"})
+
+        assert list(router.router_service.transactions) == ["tx_3", "tx_2"]